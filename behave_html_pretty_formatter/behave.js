@@ -1,17 +1,23 @@
 // Embed toggle identificators.
 var toggle_non_empty_string = "#toggle=";
 
-// Keeping the list of all toggled embeds.
-var hash_uuid_list = new Array();
-// Keep the changes to be applied
-//  - this can be filled in by hash_to_state (when hash changes)
-//  - or in toggle_hash (when some element is collapsed/expanded)
-var hash_uuid_list_change = new Array();
+// Keeping the set of all toggled embeds, tables and summaries.
+var hash_uuid_set = new Set();
+// URL hash is updated once per animation frame, however many IDs are toggled.
+var hash_update_pending = false;
+
+// Tables are numbered in order of the page, their IDs are written to the hash
+// as ranges of numbers, e.g. "t1-3.7" for "table_1,table_2,table_3,table_7".
+// Embed UUIDs are hexadecimal, they never start with "t".
+var TABLE_PREFIX = "table_";
+var TABLE_RANGES = /^t[0-9.-]+$/;
 
 // GZIP mime-type header
 var GZIP_HEADER = "data:application/octet-stream;base64,";
-const decompress = async (url) => {
-  const ds = new DecompressionStream('gzip');
+// Text embeds can be compressed also by "deflate" or "deflate-raw" codec,
+// given by their codec attribute.
+const decompress = async (url, codec = "gzip") => {
+  const ds = new DecompressionStream(codec);
   const response = await fetch(url);
   const blob_in = await response.blob();
   const stream_in = blob_in.stream().pipeThrough(ds);
@@ -19,142 +25,551 @@ const decompress = async (url) => {
   return await blob_out.text();
 };
 
-// Convert hash to state and render
-function hash_to_state() {
-  var list_of_hashes = [];
-  if (location.hash.includes(toggle_non_empty_string)) {
-    // Add parsed hashes from the URL to the list.
-    list_of_hashes = location.hash.replace(toggle_non_empty_string, "").split(",");
-    console.log("Starting ID list: " + list_of_hashes.toString());
-  }
-  if (hash_uuid_list_change.length == 0) {
-    // Compute change list - hashes that were added/removed from URL
-    for (var i = 0; i < list_of_hashes.length; i++) {
-      if (!hash_uuid_list.includes(list_of_hashes[i])) {
-        hash_uuid_list_change.push(list_of_hashes[i]);
+// Body of inline worker decoding base64 and gzip'd data off the main thread.
+function decode_worker_main() {
+  self.onmessage = async function (event) {
+    var request = event.data;
+    try {
+      var text;
+      if (request.compressed) {
+        var response = await fetch("data:application/octet-stream;base64," + request.data);
+        var blob_in = await response.blob();
+        var stream_in = blob_in.stream().pipeThrough(new DecompressionStream(request.codec));
+        text = await new Response(stream_in).text();
       }
+      else {
+        text = atob(request.data);
+      }
+      self.postMessage({ id: request.id, text: text });
+    } catch (error) {
+      self.postMessage({ id: request.id, error: String(error) });
+    }
+  };
+};
+
+// Pool of decode workers, created on first use, empty if not supported.
+var DECODE_WORKERS = Math.min(navigator.hardwareConcurrency || 2, 4);
+var decode_pool = null;
+var decode_requests = {};
+var decode_counter = 0;
+
+function get_decode_pool() {
+  if (decode_pool !== null) {
+    return decode_pool;
+  }
+  decode_pool = [];
+  try {
+    // Worker created from Blob URL works also for reports opened from file://.
+    var source = "(" + decode_worker_main.toString() + ")();";
+    var url = URL.createObjectURL(new Blob([source], { type: "text/javascript" }));
+    for (var i = 0; i < DECODE_WORKERS; i++) {
+      var worker = new Worker(url);
+      worker.onmessage = decode_finished;
+      worker.onerror = decode_pool_failed;
+      decode_pool.push(worker);
+    }
+  } catch (error) {
+    console.log("Decode workers not available: " + error);
+    decode_pool = [];
+  }
+  return decode_pool;
+};
+
+function decode_finished(event) {
+  var request = decode_requests[event.data.id];
+  delete decode_requests[event.data.id];
+  if (event.data.error !== undefined) {
+    request.reject(new Error(event.data.error));
+  }
+  else {
+    request.resolve(event.data.text);
+  }
+};
+
+// Workers failed to start, decode pending data on the main thread.
+function decode_pool_failed(event) {
+  console.log("Decode worker failed: " + event.message);
+  decode_pool.forEach(worker => worker.terminate());
+  decode_pool = [];
+  var pending = decode_requests;
+  decode_requests = {};
+  for (var id in pending) {
+    decode_on_main_thread(pending[id].data, pending[id].compressed, pending[id].codec).then(pending[id].resolve, pending[id].reject);
+  }
+};
+
+function decode_on_main_thread(data, compressed, codec) {
+  if (compressed) {
+    return decompress(GZIP_HEADER + data, codec);
+  }
+  return Promise.resolve(atob(data));
+};
+
+// Decode base64 data, inflate them if compressed, in the worker pool if possible.
+function decode_data(data, compressed, codec = "gzip") {
+  var pool = get_decode_pool();
+  if (pool.length == 0) {
+    return decode_on_main_thread(data, compressed, codec);
+  }
+  return new Promise(function (resolve, reject) {
+    decode_counter++;
+    decode_requests[decode_counter] = { resolve: resolve, reject: reject, data: data, compressed: compressed, codec: codec };
+    pool[decode_counter % pool.length].postMessage({ id: decode_counter, data: data, compressed: compressed, codec: codec });
+  });
+};
+
+// Insert text in batches, one per animation frame, so the page stays responsive.
+var TEXT_BATCH_SIZE = 128 * 1024;
+
+async function insert_text(element, text) {
+  element.textContent = "";
+  var start = 0;
+  while (start < text.length) {
+    var end = Math.min(start + TEXT_BATCH_SIZE, text.length);
+    // Do not split surrogate pair.
+    var code = text.charCodeAt(end - 1);
+    if (end < text.length && code >= 0xD800 && code <= 0xDBFF) {
+      end--;
     }
-    for (var i = 0; i < hash_uuid_list.length; i++) {
-      if (!list_of_hashes.includes(hash_uuid_list[i])) {
-        hash_uuid_list_change.push(hash_uuid_list[i]);
+    if (start > 0) {
+      await new Promise(requestAnimationFrame);
+      // Released while inserting, it is rendered again when shown.
+      if (element.classList.contains("to-render")) {
+        return;
       }
     }
+    element.append(text.slice(start, end));
+    start = end;
   }
-  // Update hash_uuid_list to be in sync with hash
-  hash_uuid_list = list_of_hashes;
+};
 
-  // Check all hashes and trigger proper function based on type.
-  console.log("Will toggle following IDs: " + hash_uuid_list_change.toString());
-  for (var i = 0; i < hash_uuid_list_change.length; i++) {
-    if (hash_uuid_list_change[i] == "high_contrast") {
-      // Trigger the high contrast.
-      toggle_contrast();
+function encode_hash_state(ids) {
+  var tokens = [];
+  var tables = [];
+  ids.forEach(id => {
+    var number = id.startsWith(TABLE_PREFIX) ? Number(id.slice(TABLE_PREFIX.length)) : NaN;
+    if (Number.isInteger(number)) {
+      tables.push(number);
     }
     else {
-      // Triggering expand/collapse of embeds.
-      collapsible_toggle(hash_uuid_list_change[i]);
+      tokens.push(id);
     }
+  });
+  if (tables.length != 0) {
+    tables.sort((a, b) => a - b);
+    var ranges = [];
+    var start = tables[0];
+    for (var i = 1; i <= tables.length; i++) {
+      if (i == tables.length || tables[i] != tables[i - 1] + 1) {
+        ranges.push(start == tables[i - 1] ? start : start + "-" + tables[i - 1]);
+        start = tables[i];
+      }
+    }
+    tokens.push("t" + ranges.join("."));
+  }
+  return tokens.join(",");
+};
+
+function decode_hash_state(hash) {
+  var ids = new Set();
+  hash.split(",").forEach(token => {
+    if (TABLE_RANGES.test(token)) {
+      token.slice(1).split(".").forEach(range => {
+        var bounds = range.split("-").map(Number);
+        var end = bounds.length > 1 ? bounds[1] : bounds[0];
+        for (var number = bounds[0]; number <= end; number++) {
+          ids.add(TABLE_PREFIX + number);
+        }
+      });
+    }
+    else if (token != "") {
+      ids.add(token);
+    }
+  });
+  return ids;
+};
+
+// Convert hash to state and render
+function hash_to_state() {
+  var hash_ids = new Set();
+  if (location.hash.includes(toggle_non_empty_string)) {
+    // Add parsed hashes from the URL to the set.
+    hash_ids = decode_hash_state(location.hash.replace(toggle_non_empty_string, ""));
+    console.log("Starting ID count: " + hash_ids.size);
+  }
+  // Compute change list - hashes that were added/removed from URL
+  var changes = [];
+  hash_ids.forEach(id => {
+    if (!hash_uuid_set.has(id)) {
+      changes.push(id);
+    }
+  });
+  hash_uuid_set.forEach(id => {
+    if (!hash_ids.has(id)) {
+      changes.push(id);
+    }
+  });
+  // Update hash_uuid_set to be in sync with hash
+  hash_uuid_set = hash_ids;
+
+  console.log("Will toggle following IDs: " + changes.toString());
+  changes.forEach(apply_toggle);
+
+  render_elements(document);
+};
+
+// Trigger proper function based on type of the toggled ID.
+function apply_toggle(id) {
+  if (id == "high_contrast") {
+    // Trigger the high contrast.
+    toggle_contrast();
+  }
+  else {
+    // Triggering expand/collapse of embeds.
+    collapsible_toggle(id);
   }
-  // Requested changes were applied, clear the list
-  hash_uuid_list_change = [];
+};
+
+// Embed data are decoded only when the embed becomes visible.
+var render_observer = null;
+if ('IntersectionObserver' in window) {
+  render_observer = new IntersectionObserver(function (entries) {
+    for (var i = 0; i < entries.length; i++) {
+      if (entries[i].isIntersecting) {
+        render_content(entries[i].target);
+      }
+    }
+  }, { rootMargin: "200px" });
+}
+
+// Decoded data bigger than this are released, when the embed is collapsed.
+var RELEASE_CONTENT_SIZE = 256 * 1024;
 
-  console.log("Rendering 'to-render' elements.");
-  elements_to_render = document.getElementsByClassName("to-render")
+// Render 'to-render' elements within the root element, once they are visible.
+function render_elements(root) {
+  console.log("Observing 'to-render' elements.");
+  var elements_to_render = Array.from(root.getElementsByClassName("to-render"));
   for (var i = 0; i < elements_to_render.length; i++) {
-    render_content(elements_to_render[i])
+    if (render_observer === null) {
+      render_content(elements_to_render[i]);
+    }
+    else {
+      render_observer.observe(elements_to_render[i]);
+    }
+  }
+};
+
+// Drop big decoded compressed data, they are decoded again when shown.
+function release_content(element) {
+  if (element === null || element.classList.contains("to-render")) {
+    return;
+  }
+  if (element.textContent.length < RELEASE_CONTENT_SIZE) {
+    return;
+  }
+  console.log("Releasing decoded data of " + element.parentElement.id);
+  element.textContent = "";
+  element.classList.add("to-render");
+  if (render_observer !== null) {
+    render_observer.observe(element);
+  }
+};
+
+// Streamed report has global summary at the end, move it to the top.
+function move_trailing_summary() {
+  var trailing_summary = document.querySelector(".global-summary-trailing");
+  if (trailing_summary === null) {
+    return;
+  }
+  document.body.prepend(...trailing_summary.children);
+  trailing_summary.remove();
+};
+
+// Deduplicated embeds reference shared blob by the content hash.
+function embed_payload(element) {
+  var blob = element.getAttribute("data-blob");
+  if (blob === null) {
+    return element.getAttribute("data");
+  }
+  return document.getElementById("blob-" + blob).textContent.trim();
+};
+
+// Trailing payloads of compressed text embeds are in scripts after the scenarios.
+// Script is removed once read, its text is kept in a Blob (out of the DOM)
+// for download and rendering of released content.
+var payload_blobs = new Map();
+
+async function text_payload(element) {
+  var payload = element.getAttribute("data-payload");
+  if (payload === null) {
+    return embed_payload(element);
+  }
+  var script = document.getElementById("p-" + payload);
+  if (script === null) {
+    return await payload_blobs.get(payload).text();
+  }
+  var data = script.textContent.trim();
+  payload_blobs.set(payload, new Blob([data]));
+  script.remove();
+  return data;
+};
+
+// Set source of deduplicated images and videos within the root element.
+function resolve_blobs(root = document) {
+  var elements = root.querySelectorAll("img[data-blob], source[data-blob]");
+  for (var i = 0; i < elements.length; i++) {
+    var elem = elements[i];
+    elem.src = "data:" + elem.getAttribute("data-mime") + ";base64," + embed_payload(elem);
+    if (elem.tagName.toLowerCase() == "source") {
+      elem.parentElement.load();
+    }
+  }
+};
+
+// Compressed report has the body in gzip'd payload, inflate it.
+async function inflate_body() {
+  var payload = document.getElementById("compressed-body");
+  if (payload === null) {
+    return false;
+  }
+  if (!('DecompressionStream' in window)) {
+    var msg = document.createElement("p");
+    msg.innerText = "Browser does not support CompressionStream API, report can not be shown.";
+    payload.before(msg);
+    return false;
+  }
+  var html = await decode_data(payload.textContent.trim(), true);
+  payload.insertAdjacentHTML("beforebegin", html);
+  payload.remove();
+  return true;
+};
+
+// Lazy feature has scenarios in gzip'd payload, inflate them once when needed.
+function inflate_feature(element) {
+  var feature = element.closest(".feature-filter-container");
+  var container = feature.querySelector(".feature-container");
+  if (container.inflated === undefined) {
+    container.inflated = inflate_container(container);
+  }
+  return container.inflated;
+};
+
+// Feature ID is the ID of the feature section, compact markup has
+// no duplicated IDs on its title and container.
+function feature_id_of(element) {
+  return element.closest(".feature-filter-container").id;
+};
+
+function feature_container(feature_id) {
+  return document.querySelector('section.feature-filter-container[id="' + feature_id + '"] > div.feature-container');
+};
+
+async function inflate_container(container) {
+  var payload = container.querySelector("script.feature-payload");
+  if (payload === null) {
+    return;
+  }
+  var feature_id = feature_id_of(container);
+  if (!('DecompressionStream' in window)) {
+    container.innerText = "Browser does not support CompressionStream API, scenarios can not be shown.";
+    return;
+  }
+  console.log("Inflating scenarios of FeatureID " + feature_id);
+  container.innerHTML = await decode_data(payload.textContent.trim(), true);
+  container.classList.remove("lazy");
+  delete scenario_models[feature_id];
+  feature_scenarios(feature_id);
+  resolve_blobs(container);
+  render_elements(container);
+  // Apply state of the page to the new scenarios.
+  container.querySelectorAll(".embed-button, tbody[id]").forEach(elem => {
+    var id = elem.classList.contains("embed-button") ? elem.id.slice("embed_button_".length) : elem.id;
+    if (hash_uuid_set.has(id)) {
+      collapsible_toggle(id);
+    }
+  });
+  if (document.querySelector('input[type="checkbox"]#scenario-filter:checked, input[type="checkbox"]#tag-filter:checked') !== null) {
+    filter_scenarios("", [feature_id]);
+  }
+  if (document.querySelector('input[type="checkbox"]#scenario-filter-' + feature_id + ':checked') !== null) {
+    filter_feature_scenarios(feature_id);
+  }
+  virtualize_feature(container);
+};
+
+// Inflate all lazy features, e.g. when scenarios of all features are filtered.
+function inflate_features() {
+  var containers = document.querySelectorAll(".feature-container.lazy");
+  return Promise.all(Array.from(containers).map(inflate_feature));
+};
+
+// Prepare the page, once the body is inflated (if compressed).
+async function init_page() {
+  var inflated = await inflate_body();
+  // Toggled embeds in URL can be in lazy features.
+  if (location.hash.includes(toggle_non_empty_string)) {
+    await inflate_features();
+  }
+  move_trailing_summary();
+  create_feature_buttons();
+  build_tag_filter();
+  resolve_blobs();
+  hash_to_state();
+  document.querySelectorAll("div.feature-container").forEach(virtualize_feature);
+  // Body has no onload attribute, when compressed.
+  if (inflated) {
+    body_onload();
+  }
+};
+
+// Buttons of every feature in compact markup, created from the template.
+const FEATURE_BUTTONS = [
+  ["Expand All", "expand_all"],
+  ["Collapse All", "collapse_all"],
+  ["Expand All Failed", "expand_all_failed"],
+];
+
+function create_feature_buttons() {
+  document.querySelectorAll(".feature-buttons:empty").forEach(block => {
+    FEATURE_BUTTONS.forEach(([label, action]) => {
+      var button = document.createElement("span");
+      button.className = "button display-block";
+      button.dataset.expand = action;
+      button.textContent = label;
+      block.append(button);
+    });
+  });
+};
+
+// Compact markup has no inline handlers, events of all elements are delegated
+// to the document. Elements with inline handlers (e.g. merged from reports
+// without compact markup) are skipped.
+const DOWNLOAD_HANDLERS = {
+  download_embed: download_embed,
+  download_plaintext: download_plaintext,
+};
+
+function delegated_target(event, selector, handler_attribute) {
+  var target = event.target.closest(selector);
+  if (target === null || target.hasAttribute(handler_attribute)) {
+    return null;
+  }
+  return target;
+};
+
+function delegate_click(event) {
+  var target = delegated_target(event, ".scenario-name, .embed-button, table.table > thead, [data-toggle], [data-expand], [data-download]", "onclick");
+  if (target === null) {
+    return;
+  }
+  if (target.classList.contains("scenario-name")) {
+    expand_this_only(target);
+  }
+  else if (target.classList.contains("embed-button")) {
+    toggle_hash(target.id.slice("embed_button_".length));
+  }
+  else if (target.tagName == "THEAD") {
+    // Tables without collapsible body (e.g. diagnostics timings) do nothing.
+    var table_body = target.nextElementSibling;
+    if (table_body !== null && table_body.id) {
+      toggle_hash(table_body.id);
+    }
+  }
+  else if (target.dataset.toggle !== undefined) {
+    toggle_hash(target.dataset.toggle);
+  }
+  else if (target.dataset.expand !== undefined) {
+    expander(target.dataset.expand, target);
+  }
+  else if (target.dataset.download in DOWNLOAD_HANDLERS) {
+    var embed = target.closest(".embed-content");
+    DOWNLOAD_HANDLERS[target.dataset.download](embed.id, target.dataset.filename);
+  }
+};
+
+function delegate_change(event) {
+  var target = delegated_target(event, 'input[type="checkbox"][id^="scenario-filter-"]', "onchange");
+  if (target !== null) {
+    filter_scenarios_by_status(target);
   }
 };
 
 // Trigger proper functions on content load.
-document.addEventListener("DOMContentLoaded", hash_to_state);
+document.addEventListener("DOMContentLoaded", init_page);
+document.addEventListener("click", delegate_click);
+document.addEventListener("change", delegate_change);
 window.onhashchange = hash_to_state;
 
 
 // Change visibility of element and change URL
 function toggle_hash(id) {
   console.log("Toggle ID: " + id);
-  // Save element to be changed
-  hash_uuid_list_change.push(id)
-  // Change uuid list
-  if (hash_uuid_list.includes(id)) {
-    hash_uuid_list.splice(hash_uuid_list.indexOf(id), 1);
+  // Change uuid set
+  if (!hash_uuid_set.delete(id)) {
+    hash_uuid_set.add(id);
   }
-  else {
-    hash_uuid_list.push(id);
+  apply_toggle(id);
+  if (!hash_update_pending) {
+    hash_update_pending = true;
+    requestAnimationFrame(update_hash);
   }
-  // Update URL hash
+};
+
+// Write the toggled IDs to the URL hash, replaceState triggers no hashchange.
+function update_hash() {
+  hash_update_pending = false;
   var hash = "#";
-  if (hash_uuid_list.length != 0) {
-    hash = toggle_non_empty_string + hash_uuid_list.toString()
+  if (hash_uuid_set.size != 0) {
+    hash = toggle_non_empty_string + encode_hash_state(hash_uuid_set);
   }
   console.log("New hash: " + hash);
   history.replaceState(undefined, undefined, hash);
-  // Need to call hash_to_state, event is not triggered for some reason
-  hash_to_state();
 };
 
 function collapsible_toggle(id) {
   console.log("Toggle embed: " + id);
   var embed_button_id = "embed_button_" + id
-  var parent = document.getElementById(embed_button_id);
-  if (parent === null) {
+  var button = find_element(embed_button_id);
+  if (button === null) {
     // can be table
-    var elem = document.getElementById(id);
+    var elem = find_element(id);
     if (elem != null) {
       toggle_class(elem, "collapse");
     }
     return;
   }
-  while (parent !== undefined && !parent.classList.contains("embed-button")) {
-    parent = parent.parentElement;
-  }
-  if (parent !== undefined) {
-    toggle_class(parent, "collapse");
-  }
+  toggle_class(button, "collapse");
 
   var embed_content_id = "embed_" + id
-  var elem = document.getElementById(embed_content_id);
+  var elem = find_element(embed_content_id);
   // decompress compressed data
   var compressed_data = elem.querySelector("span.to-render");
   if (compressed_data) {
     render_content(compressed_data)
   }
   toggle_class(elem, "collapse");
+  if (elem.classList.contains("collapse")) {
+    release_content(elem.querySelector('span[compressed="true"]'));
+  }
 };
 
-function expander(action, summary_block) {
-  var elem = Array.from(document.getElementsByClassName("scenario-capsule"));
-  elem = elem.concat(Array.from(document.getElementsByClassName("scenario-header")));
+async function expander(action, summary_block) {
+  await inflate_feature(summary_block);
   var feature_id = summary_block.parentElement.parentElement.dataset.featureId
   console.log("Doing " + action + " on FeatureID " + feature_id);
-  for (var i = 0; i < elem.length; i++) {
-    if (feature_id != elem[i].parentElement.parentElement.id) {
-      continue
-    }
-    if (action == "expand_all") {
-      elem[i].classList.remove("collapse")
-    }
-    else if (action == "collapse_all") {
-      if (!elem[i].classList.contains("collapse")) {
-        elem[i].classList.add("collapse");
-      }
-    }
-    else if (action == "expand_all_failed") {
-      if (!elem[i].classList.contains("passed")) {
-        elem[i].classList.remove("collapse");
-      }
-      else {
-        if (!elem[i].classList.contains("collapse")) {
-          elem[i].classList.add("collapse");
-        }
-      }
-    }
-  }
+  // Single pass on the model, only scenarios changing state are touched.
+  feature_scenarios(feature_id).forEach(scenario => {
+    var collapse = action == "collapse_all"
+      || (action == "expand_all_failed" && scenario.header.classList.contains("passed"));
+    scenario.header.classList.toggle("collapse", collapse);
+    scenario.capsule.classList.toggle("collapse", collapse);
+  });
+  refresh_blocks();
 };
 
 
 function expand_this_only(name) {
-  var id = name.id;
+  var id = name.closest(".scenario-filter-container").id;
   var capsule = document.getElementById(id + "-c");
   var header = document.getElementById(id + "-h");
   if (header.classList.contains("collapse")) {
@@ -305,7 +720,7 @@ function decodeHTMLEntities(str) {
   return str;
 };
 
-function download_embed(id, filename) {
+async function download_embed(id, filename) {
   var elem = document.getElementById(id);
   var child = elem.children[1];
   var value = "";
@@ -315,9 +730,15 @@ function download_embed(id, filename) {
     if (child.getAttribute("mime").indexOf("html") != -1 || child.getAttribute("mime").indexOf("markdown") != -1) {
       extension = ".html"
     }
-    if (child.getAttribute("compressed") == "true") {
+    var codec = child.getAttribute("codec");
+    if (child.getAttribute("compressed") == "true" && codec === null) {
       extension = extension + ".gz";
-      value = GZIP_HEADER + child.getAttribute("data");
+      value = GZIP_HEADER + await text_payload(child);
+    }
+    else if (child.getAttribute("compressed") == "true") {
+      // Other codecs have no common file format, text is downloaded inflated.
+      var text = await decode_data(await text_payload(child), true, codec);
+      value = URL.createObjectURL(new Blob([text]));
     }
     else {
       value = "data:text/html," + encodeURIComponent(decodeHTMLEntities(child.innerHTML));
@@ -373,26 +794,27 @@ function download_plaintext(id, filename) {
 };
 
 async function render_content(element) {
+  // Element can be shown by toggle and observer at the same time.
+  if (!element.classList.contains("to-render")) {
+    return;
+  }
   element.classList.remove("to-render");
+  if (render_observer !== null) {
+    render_observer.unobserve(element);
+  }
   var show = element.getAttribute("show");
   var compressed = element.getAttribute("compressed");
-  var data = element.getAttribute("data");
+  var data = await text_payload(element);
   var ds = ('DecompressionStream' in window);
   // We can't show compressed data, if browser doesn't support it
   if (show == "true" && (compressed != "true" || ds)) {
-    if (compressed == "true") {
-      data = GZIP_HEADER + data;
-      data = await decompress(data);
-    }
-    else {
-      data = atob(data);
-    }
+    data = await decode_data(data, compressed == "true", element.getAttribute("codec") || "gzip");
     var mime = element.getAttribute("mime");
     if (mime.indexOf("html") >= 0 || mime.indexOf("markdown") >= 0) {
       element.innerHTML = data;
     }
     else {
-      element.innerText = data;
+      await insert_text(element, data);
     }
   }
   else {
@@ -408,6 +830,240 @@ async function render_content(element) {
   }
 };
 
+// In-memory model of scenarios of every feature, filters and expanders work
+// on it, so that scenarios detached by virtualization are included.
+var scenario_models = {};
+
+function feature_scenarios(feature_id) {
+  if (scenario_models[feature_id] === undefined) {
+    var container = feature_container(feature_id);
+    if (container === null) {
+      return [];
+    }
+    var sections = container.querySelectorAll(".scenario-filter-container");
+    scenario_models[feature_id] = Array.from(sections).map(section => ({
+      id: section.id,
+      section: section,
+      header: section.querySelector(".scenario-header"),
+      capsule: section.querySelector(".scenario-capsule"),
+    }));
+  }
+  return scenario_models[feature_id];
+};
+
+// Index of scenario IDs by status, tag and feature, written by the formatter.
+// Scenarios are referenced by their position in the list of scenario IDs.
+var scenario_index = null;
+
+function get_scenario_index() {
+  if (scenario_index === null) {
+    var elem = document.getElementById("scenario-index");
+    scenario_index = { scenarios: [], status: {}, tag: {}, feature: {} };
+    if (elem !== null) {
+      scenario_index = JSON.parse(elem.textContent);
+    }
+  }
+  return scenario_index;
+};
+
+// Positions of scenarios with any of the keys, null if no key is selected.
+function indexed_scenarios(group, keys) {
+  if (keys.length == 0) {
+    return null;
+  }
+  var positions = new Set();
+  keys.forEach(key => (group[key] || []).forEach(position => positions.add(position)));
+  return positions;
+};
+
+// Tag filter in the global summary is built from the scenario index.
+function build_tag_filter() {
+  var row = document.querySelector(".tag-filter");
+  if (row === null) {
+    return;
+  }
+  var tags = Object.keys(get_scenario_index().tag).sort();
+  if (tags.length == 0) {
+    row.remove();
+    return;
+  }
+  for (var i = 0; i < tags.length; i++) {
+    var input = document.createElement("input");
+    input.type = "checkbox";
+    input.id = "tag-filter";
+    input.value = tags[i];
+    input.onchange = filter_global_scenarios_by_status;
+    var label = document.createElement("label");
+    label.className = "global-summary-status";
+    label.append(input, "@" + tags[i] + " (" + scenario_index.tag[tags[i]].length + ") ");
+    row.append(label);
+  }
+};
+
+// Features with many scenarios keep only blocks of scenarios near the viewport
+// in the document, the other blocks are detached and replaced by their height.
+var VIRTUAL_SCENARIOS = 200;
+var VIRTUAL_BLOCK_SIZE = 50;
+var detached_blocks = new Set();
+var virtual_observer = null;
+if ('IntersectionObserver' in window) {
+  virtual_observer = new IntersectionObserver(function (entries) {
+    var detach = entries.filter(entry => !entry.isIntersecting && !detached_blocks.has(entry.target));
+    // Read all heights first, writes in between would force layout every time.
+    var heights = detach.map(entry => entry.target.offsetHeight);
+    for (var i = 0; i < detach.length; i++) {
+      detach_block(detach[i].target, heights[i]);
+    }
+    entries.filter(entry => entry.isIntersecting).forEach(entry => attach_block(entry.target));
+  }, { rootMargin: "1000px 0px" });
+}
+
+function virtualize_feature(container) {
+  if (virtual_observer === null || container.classList.contains("lazy")) {
+    return;
+  }
+  var sections = Array.from(container.querySelectorAll(":scope > .scenario-filter-container"));
+  if (sections.length < VIRTUAL_SCENARIOS) {
+    return;
+  }
+  var feature_id = feature_id_of(container);
+  console.log("Virtualizing scenarios of FeatureID " + feature_id);
+  // Model is built from all sections, before any block is detached.
+  feature_scenarios(feature_id);
+  for (var i = 0; i < sections.length; i += VIRTUAL_BLOCK_SIZE) {
+    var block = document.createElement("div");
+    block.className = "scenario-block";
+    sections[i].before(block);
+    block.append(...sections.slice(i, i + VIRTUAL_BLOCK_SIZE));
+    virtual_observer.observe(block);
+  }
+};
+
+function detach_block(block, height) {
+  block.style.height = height + "px";
+  block.fragment = document.createDocumentFragment();
+  block.fragment.append(...block.childNodes);
+  detached_blocks.add(block);
+};
+
+function attach_block(block) {
+  if (!detached_blocks.has(block)) {
+    return;
+  }
+  block.append(block.fragment);
+  block.fragment = null;
+  block.style.height = "";
+  detached_blocks.delete(block);
+};
+
+// Heights of detached blocks are not valid after filter or expander changed
+// their scenarios, attach them, observer detaches them again with new height.
+function refresh_blocks() {
+  for (var block of Array.from(detached_blocks)) {
+    attach_block(block);
+    virtual_observer.unobserve(block);
+    virtual_observer.observe(block);
+  }
+};
+
+// Find element by ID, also in detached blocks of scenarios.
+function find_element(id) {
+  var elem = document.getElementById(id);
+  for (var block of detached_blocks) {
+    if (elem !== null) {
+      break;
+    }
+    elem = block.fragment.getElementById(id);
+  }
+  return elem;
+};
+
+// Attach detached block of scenarios containing the element.
+function attach_element(elem) {
+  for (var block of Array.from(detached_blocks)) {
+    if (block.fragment.contains(elem)) {
+      attach_block(block);
+    }
+  }
+};
+
+// Full-text search index written by the formatter, decoded on first search.
+var search_index = null;
+var SEARCH_TOKEN = /[\p{L}\p{N}_]{2,}/gu;
+var MAX_SEARCH_RESULTS = 100;
+
+function get_search_index() {
+  if (search_index === null) {
+    var elem = document.getElementById("search-index");
+    search_index = Promise.resolve({ names: [], targets: [], tokens: {} });
+    if (elem !== null) {
+      search_index = decode_data(elem.textContent.trim(), true).then(JSON.parse);
+    }
+  }
+  return search_index;
+};
+
+// Show places matching all words of the query, words match token prefixes.
+async function search_report(query) {
+  var results = document.getElementById("search-results");
+  results.textContent = "";
+  var words = query.toLowerCase().match(SEARCH_TOKEN) || [];
+  if (words.length == 0) {
+    return;
+  }
+  var index = await get_search_index();
+  var tokens = Object.keys(index.tokens);
+  var matched = null;
+  words.forEach(word => {
+    var positions = new Set();
+    tokens.filter(token => token.startsWith(word))
+      .forEach(token => index.tokens[token].forEach(position => positions.add(position)));
+    if (matched !== null) {
+      positions = new Set(Array.from(matched).filter(position => positions.has(position)));
+    }
+    matched = positions;
+  });
+  var positions = Array.from(matched).sort((a, b) => a - b);
+  console.log("Search '" + query + "' matches: " + positions.length);
+  results.append("Matches: " + positions.length);
+  positions.slice(0, MAX_SEARCH_RESULTS).forEach(position => {
+    var target = index.targets[position];
+    var item = document.createElement("div");
+    item.className = "search-result";
+    item.innerText = index.names[target[0]];
+    if (target.length > 1) {
+      item.innerText += " - " + (target[2] || "Embed");
+    }
+    item.onclick = () => show_search_result(target);
+    results.append(item);
+  });
+};
+
+// Expand only the scenario (and embed) of the search result and scroll to it.
+async function show_search_result(target) {
+  var scenario_id = get_scenario_index().scenarios[target[0]];
+  var feature_id = scenario_id.split("-")[0];
+  await inflate_feature(feature_container(feature_id));
+  var scenario = feature_scenarios(feature_id).find(scenario => scenario.id == scenario_id);
+  if (scenario === undefined) {
+    return;
+  }
+  attach_element(scenario.section);
+  scenario.header.classList.remove("collapse");
+  scenario.capsule.classList.remove("collapse");
+  var elem = scenario.section;
+  if (target.length > 1) {
+    var embed = find_element("embed_" + target[1]);
+    if (embed !== null) {
+      if (embed.classList.contains("collapse")) {
+        toggle_hash(target[1]);
+      }
+      elem = embed;
+    }
+  }
+  elem.scrollIntoView({ block: "center" });
+};
+
 function filter_features_by_status() {
   const checkboxes = document.querySelectorAll('input[type="checkbox"]#feature-filter');
   const selectedClasses = Array.from(checkboxes)
@@ -423,46 +1079,58 @@ function filter_features_by_status() {
   });
 };
 
-function filter_scenarios_by_status(this_block) {
+async function filter_scenarios_by_status(this_block) {
+  // Scenarios of lazy feature must be inflated first.
+  await inflate_feature(this_block);
   var element = this_block
   while (element && !element.dataset.featureId) {
     element = element.parentElement
   }
-  const feature_id = element.dataset.featureId
-
-  const checkboxes = document.querySelectorAll('input[type="checkbox"]#scenario-filter-' + feature_id);
-  const selectedClasses = Array.from(checkboxes)
-    .filter(checkbox => checkbox.checked)
-    .map(checkbox => checkbox.value);
-  console.log("Filtering Scenarios of Feature: " + feature_id + " " + selectedClasses);
-
-  const scenario_capsule = '.scenario-capsule[id^="' + feature_id + '"], '
-  const scenario_header = '.scenario-header[id^="' + feature_id + '"]'
-
-  const items = document.querySelectorAll(scenario_capsule + scenario_header);
+  filter_feature_scenarios(element.dataset.featureId);
+};
 
-  items.forEach(item => {
-    const matches = selectedClasses.some(className => item.classList.contains(className));
-    item.style.display = selectedClasses.length === 0 || matches ? '' : 'none';
-  });
+function filter_feature_scenarios(feature_id) {
+  console.log("Filtering Scenarios of Feature: " + feature_id);
+  filter_scenarios("-" + feature_id, [feature_id]);
 };
 
 function filter_global_scenarios_by_status() {
-  const checkboxes = document.querySelectorAll('input[type="checkbox"]#scenario-filter');
-  const selectedClasses = Array.from(checkboxes)
+  // Lazy features are filtered when they are inflated.
+  console.log("Filtering All Scenarios of All Features");
+  filter_scenarios("", Object.keys(get_scenario_index().feature));
+};
+
+function selected_values(checkbox_selector) {
+  return Array.from(document.querySelectorAll(checkbox_selector))
     .filter(checkbox => checkbox.checked)
     .map(checkbox => checkbox.value);
-  console.log("Filtering All Scenarios of All Features:" + selectedClasses);
-
-  const scenario_capsule = '.scenario-capsule, '
-  const scenario_header = '.scenario-header'
+};
 
-  const items = document.querySelectorAll(scenario_capsule + scenario_header);
+// Show only scenarios with status (and tag in global filter) selected by checkboxes.
+function filter_scenarios(filter_suffix, feature_ids) {
+  const index = get_scenario_index();
+  const selectedClasses = selected_values('input[type="checkbox"]#scenario-filter' + filter_suffix);
+  const statuses = indexed_scenarios(index.status, selectedClasses);
+  var tags = null;
+  if (filter_suffix == "") {
+    tags = indexed_scenarios(index.tag, selected_values('input[type="checkbox"]#tag-filter'));
+  }
+  console.log("Selected statuses: " + selectedClasses);
 
-  items.forEach(item => {
-    const matches = selectedClasses.some(className => item.classList.contains(className));
-    item.style.display = selectedClasses.length === 0 || matches ? '' : 'none';
+  feature_ids.forEach(feature_id => {
+    const range = index.feature[feature_id] || [0, 0];
+    const sections = {};
+    feature_scenarios(feature_id).forEach(scenario => sections[scenario.id] = scenario.section);
+    for (var position = range[0]; position < range[1]; position++) {
+      const section = sections[index.scenarios[position]];
+      if (section === undefined) {
+        continue;
+      }
+      const hidden = (statuses !== null && !statuses.has(position)) || (tags !== null && !tags.has(position));
+      section.classList.toggle("filtered-out", hidden);
+    }
   });
+  refresh_blocks();
 };
 
 // When scrolling down 300px from the top of the document, show the button.
@@ -1 +1 @@
-var toggle_non_empty_string="#toggle=";var hash_uuid_list=new Array();var hash_uuid_list_change=new Array();var GZIP_HEADER="data:application/octet-stream;base64,";const decompress=async(url)=>{const ds=new DecompressionStream('gzip');const response=await fetch(url);const blob_in=await response.blob();const stream_in=blob_in.stream().pipeThrough(ds);const blob_out=await new Response(stream_in).blob();return await blob_out.text();};function hash_to_state(){var list_of_hashes=[];if(location.hash.includes(toggle_non_empty_string)){list_of_hashes=location.hash.replace(toggle_non_empty_string,"").split(",");console.log("Starting ID list: "+list_of_hashes.toString());};if(hash_uuid_list_change.length==0){for(var i=0;i<list_of_hashes.length;i++){if(!hash_uuid_list.includes(list_of_hashes[i])){hash_uuid_list_change.push(list_of_hashes[i]);}};for(var i=0;i<hash_uuid_list.length;i++){if(!list_of_hashes.includes(hash_uuid_list[i])){hash_uuid_list_change.push(hash_uuid_list[i]);}}};hash_uuid_list=list_of_hashes;console.log("Will toggle following IDs: "+hash_uuid_list_change.toString());for(var i=0;i<hash_uuid_list_change.length;i++){if(hash_uuid_list_change[i]=="high_contrast"){toggle_contrast();}else{collapsible_toggle(hash_uuid_list_change[i]);}};hash_uuid_list_change=[];console.log("Rendering 'to-render' elements.");elements_to_render=document.getElementsByClassName("to-render");for(var i=0;i<elements_to_render.length;i++){render_content(elements_to_render[i])}};document.addEventListener("DOMContentLoaded",hash_to_state);window.onhashchange=hash_to_state;function toggle_hash(id){console.log("Toggle ID: "+id);hash_uuid_list_change.push(id);if(hash_uuid_list.includes(id)){hash_uuid_list.splice(hash_uuid_list.indexOf(id),1);}else{hash_uuid_list.push(id);};var hash="#";if(hash_uuid_list.length!=0){hash=toggle_non_empty_string+hash_uuid_list.toString()};console.log("New hash: "+hash);history.replaceState(undefined,undefined,hash);hash_to_state();};function collapsible_toggle(id){console.log("Toggle embed: "+id);var embed_button_id="embed_button_"+id;var parent=document.getElementById(embed_button_id);if(parent===null){var elem=document.getElementById(id);if(elem!=null){toggle_class(elem,"collapse");};return;};while(parent!==undefined&&!parent.classList.contains("embed-button")){parent=parent.parentElement;};if(parent!==undefined){toggle_class(parent,"collapse");};var embed_content_id="embed_"+id;var elem=document.getElementById(embed_content_id);var compressed_data=elem.querySelector("span.to-render");if(compressed_data){render_content(compressed_data)};toggle_class(elem,"collapse");};function expander(action,summary_block){var elem=Array.from(document.getElementsByClassName("scenario-capsule"));elem=elem.concat(Array.from(document.getElementsByClassName("scenario-header")));var feature_id=summary_block.parentElement.parentElement.dataset.featureId;console.log("Doing "+action+" on FeatureID "+feature_id);for(var i=0;i<elem.length;i++){if(feature_id!=elem[i].parentElement.parentElement.id){continue};if(action=="expand_all"){elem[i].classList.remove("collapse")}else if(action=="collapse_all"){if(!elem[i].classList.contains("collapse")){elem[i].classList.add("collapse");}}else if(action=="expand_all_failed"){if(!elem[i].classList.contains("passed")){elem[i].classList.remove("collapse");}else{if(!elem[i].classList.contains("collapse")){elem[i].classList.add("collapse");}}}}};function expand_this_only(name){var id=name.id;var capsule=document.getElementById(id+"-c");var header=document.getElementById(id+"-h");if(header.classList.contains("collapse")){header.classList.remove("collapse");capsule.classList.remove("collapse");}else{header.classList.add("collapse");capsule.classList.add("collapse");}};function toggle_class(elem,class_name){if(elem.classList.contains(class_name)){elem.classList.remove(class_name);}else{elem.classList.add(class_name)}};function toggle_contrast(){if(document.body.classList.contains("contrast")){document.body.classList.remove("contrast");}else{document.body.classList.add("contrast");}};function detect_dark_mode(){return window.matchMedia&&window.matchMedia('(prefers-color-scheme: dark)').matches;};function invert_thm_name(theme){if(theme=="dark"){return"light";};if(theme=="light"){return"dark";};return undefined;};function format_thm_name(theme){if(theme=="dark"){return"Dark mode";};if(theme=="light"){return"Light mode";};if(theme=="auto"){return"Default mode";};return undefined;};function set_theme(theme){document.querySelector("html").setAttribute("data-theme",theme);localStorage.setItem("theme",theme);};function toggle_dark_mode(){var current=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current);var next_thm=dark_mode_toggle.dataset.nextValue;dark_mode_toggle.dataset.value=next_thm;if(next_thm=="auto"){dark_mode_toggle.dataset.nextValue=current_inv;set_theme(current);}else{console.log(current+" "+next_thm);if(current==next_thm){dark_mode_toggle.dataset.nextValue="auto";}else{next_inv=invert_thm_name(next_thm);dark_mode_toggle.dataset.nextValue=next_inv;};set_theme(next_thm);};dark_mode_toggle.innerText=format_thm_name(dark_mode_toggle.dataset.nextValue);};function dark_mode_change(){console.log("called");var current_thm=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current_thm);var value_thm=dark_mode_toggle.dataset.value;if(value_thm=="auto"){dark_mode_toggle.dataset.nextValue=current_inv;set_theme(current_thm);}else{if(current_thm==value_thm){dark_mode_toggle.dataset.nextValue="auto";}else{dark_mode_toggle.dataset.nextValue=invert_thm_name(value_thm);}};dark_mode_toggle.innerText=format_thm_name(dark_mode_toggle.dataset.nextValue);};function detect_contrast(){var obj_div=document.createElement("div");obj_div.style.color="rgb(31, 41, 59)";document.body.appendChild(obj_div);var col=document.defaultView?document.defaultView.getComputedStyle(obj_div,null).color:obj_div.currentStyle.color;document.body.removeChild(obj_div);col=col.replace(/ /g,"");if(col!=="rgb(31,41,59)"){console.log("High Contrast theme detected.");toggle_contrast();}};function body_onload(){detect_contrast();var dark_mode_matcher=window.matchMedia?window.matchMedia('(prefers-color-scheme: dark)'):null;if(dark_mode_matcher){dark_mode_matcher.onchange=dark_mode_change};var dark_mode_toggle=document.getElementById("dark_mode_toggle");var current_thm=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current_thm);dark_mode_toggle.dataset.nextValue=current_inv;dark_mode_toggle.innerText=format_thm_name(current_inv);set_theme(current_thm);};var element=document.createElement('div');var entity=/&(?:#x[a-f0-9]+|#[0-9]+|[a-z0-9]+);?/ig;function decodeHTMLEntities(str){str=str.replace(entity,function(m){element.innerHTML=m;return element.textContent;});element.textContent='';return str;};function download_embed(id,filename){var elem=document.getElementById(id);var child=elem.children[1];var value="";var tag=child.tagName.toLowerCase();if(tag==="span"){extension=".txt";if(child.getAttribute("mime").indexOf("html")!=-1||child.getAttribute("mime").indexOf("markdown")!=-1){extension=".html"};if(child.getAttribute("compressed")=="true"){extension=extension+".gz";value=GZIP_HEADER+child.getAttribute("data");}else{value="data:text/html,"+encodeURIComponent(decodeHTMLEntities(child.innerHTML));}}else if(tag=="video"){extension=".webm";value=child.children[0].src;}else if(tag=="img"){extension=".png";value=child.src;}else{extension=".html";value=decodeHTMLEntities(child.innerHTML);};var extend_filename=!filename.match(/\.[a-zA-Z][a-zA-Z][a-zA-Z]?$/g);if(extend_filename){filename+=extension;};var link=document.createElement("a");link.style.display="none";link.href=value;link.download=filename;document.body.appendChild(link);link.click();setTimeout(function(){document.body.removeChild(link);},2000);};function download_plaintext(id,filename){var elem=document.getElementById(id);var child=elem.children[1];var value="";var tag=child.tagName.toLowerCase();extension=".txt";value="data:text/plain,"+encodeURIComponent(decodeHTMLEntities(child.textContent));var extend_filename=!filename.match(/\.[a-zA-Z][a-zA-Z][a-zA-Z]?$/g);if(extend_filename){filename+=extension;};var link=document.createElement("a");link.style.display="none";link.href=value;link.download=filename;document.body.appendChild(link);link.click();setTimeout(function(){document.body.removeChild(link);},2000);};async function render_content(element){element.classList.remove("to-render");var show=element.getAttribute("show");var compressed=element.getAttribute("compressed");var data=element.getAttribute("data");var ds=('DecompressionStream'in window);if(show=="true"&&(compressed!="true"||ds)){if(compressed=="true"){data=GZIP_HEADER+data;data=await decompress(data);}else{data=atob(data);};var mime=element.getAttribute("mime");if(mime.indexOf("html")>=0||mime.indexOf("markdown")>=0){element.innerHTML=data;}else{element.innerText=data;}}else{var msg="click download above.";if(show=="true"){msg="Browser does not support CompressionStream API, "+msg;}else{msg="Compressed data are too big, "+msg;};element.innerText=msg;}};function filter_features_by_status(){const checkboxes=document.querySelectorAll('input[type="checkbox"]#feature-filter');const selectedClasses=Array.from(checkboxes).filter(checkbox=>checkbox.checked).map(checkbox=>checkbox.value);console.log("Filtering Features: "+selectedClasses);const items=document.querySelectorAll('.feature-filter-container');items.forEach(item=>{const matches=selectedClasses.some(className=>item.classList.contains(className));item.style.display=selectedClasses.length===0||matches?'':'none';});};function filter_scenarios_by_status(this_block){var element=this_block;while(element&&!element.dataset.featureId){element=element.parentElement};const feature_id=element.dataset.featureId;const checkboxes=document.querySelectorAll('input[type="checkbox"]#scenario-filter-'+feature_id);const selectedClasses=Array.from(checkboxes).filter(checkbox=>checkbox.checked).map(checkbox=>checkbox.value);console.log("Filtering Scenarios of Feature: "+feature_id+" "+selectedClasses);const scenario_capsule='.scenario-capsule[id^="'+feature_id+'"], ';const scenario_header='.scenario-header[id^="'+feature_id+'"]';const items=document.querySelectorAll(scenario_capsule+scenario_header);items.forEach(item=>{const matches=selectedClasses.some(className=>item.classList.contains(className));item.style.display=selectedClasses.length===0||matches?'':'none';});};function filter_global_scenarios_by_status(){const checkboxes=document.querySelectorAll('input[type="checkbox"]#scenario-filter');const selectedClasses=Array.from(checkboxes).filter(checkbox=>checkbox.checked).map(checkbox=>checkbox.value);console.log("Filtering All Scenarios of All Features:"+selectedClasses);const scenario_capsule='.scenario-capsule, ';const scenario_header='.scenario-header';const items=document.querySelectorAll(scenario_capsule+scenario_header);items.forEach(item=>{const matches=selectedClasses.some(className=>item.classList.contains(className));item.style.display=selectedClasses.length===0||matches?'':'none';});};window.onscroll=function(){scroll_function()};function scroll_function(){let return_button=document.getElementById("return_to_the_top_button");if(return_button==null){return;};if(document.body.scrollTop>300||document.documentElement.scrollTop>300){return_button.classList.add("show");}else{return_button.classList.remove("show");}};function return_to_the_top(){document.body.scrollTo({top:0,behavior:'smooth'});document.documentElement.scrollTo({top:0,behavior:'smooth'});};
\ No newline at end of file
+var toggle_non_empty_string="#toggle=";var hash_uuid_set=new Set();var hash_update_pending=false;var TABLE_PREFIX="table_";var TABLE_RANGES=/^t[0-9.-]+$/;var GZIP_HEADER="data:application/octet-stream;base64,";const decompress=async(url,codec="gzip")=>{const ds=new DecompressionStream(codec);const response=await fetch(url);const blob_in=await response.blob();const stream_in=blob_in.stream().pipeThrough(ds);const blob_out=await new Response(stream_in).blob();return await blob_out.text();};function decode_worker_main(){self.onmessage=async function(event){var request=event.data;try{var text;if(request.compressed){var response=await fetch("data:application/octet-stream;base64,"+request.data);var blob_in=await response.blob();var stream_in=blob_in.stream().pipeThrough(new DecompressionStream(request.codec));text=await new Response(stream_in).text();}else{text=atob(request.data);};self.postMessage({id:request.id,text:text});}catch(error){self.postMessage({id:request.id,error:String(error)});}};};var DECODE_WORKERS=Math.min(navigator.hardwareConcurrency||2,4);var decode_pool=null;var decode_requests={};var decode_counter=0;function get_decode_pool(){if(decode_pool!==null){return decode_pool;};decode_pool=[];try{var source="("+decode_worker_main.toString()+")();";var url=URL.createObjectURL(new Blob([source],{type:"text/javascript"}));for(var i=0;i<DECODE_WORKERS;i++){var worker=new Worker(url);worker.onmessage=decode_finished;worker.onerror=decode_pool_failed;decode_pool.push(worker);}}catch(error){console.log("Decode workers not available: "+error);decode_pool=[];};return decode_pool;};function decode_finished(event){var request=decode_requests[event.data.id];delete decode_requests[event.data.id];if(event.data.error!==undefined){request.reject(new Error(event.data.error));}else{request.resolve(event.data.text);}};function decode_pool_failed(event){console.log("Decode worker failed: "+event.message);decode_pool.forEach(worker=>worker.terminate());decode_pool=[];var pending=decode_requests;decode_requests={};for(var id in pending){decode_on_main_thread(pending[id].data,pending[id].compressed,pending[id].codec).then(pending[id].resolve,pending[id].reject);}};function decode_on_main_thread(data,compressed,codec){if(compressed){return decompress(GZIP_HEADER+data,codec);};return Promise.resolve(atob(data));};function decode_data(data,compressed,codec="gzip"){var pool=get_decode_pool();if(pool.length==0){return decode_on_main_thread(data,compressed,codec);};return new Promise(function(resolve,reject){decode_counter++;decode_requests[decode_counter]={resolve:resolve,reject:reject,data:data,compressed:compressed,codec:codec};pool[decode_counter%pool.length].postMessage({id:decode_counter,data:data,compressed:compressed,codec:codec});});};var TEXT_BATCH_SIZE=128*1024;async function insert_text(element,text){element.textContent="";var start=0;while(start<text.length){var end=Math.min(start+TEXT_BATCH_SIZE,text.length);var code=text.charCodeAt(end-1);if(end<text.length&&code>=0xD800&&code<=0xDBFF){end--;};if(start>0){await new Promise(requestAnimationFrame);if(element.classList.contains("to-render")){return;}};element.append(text.slice(start,end));start=end;}};function encode_hash_state(ids){var tokens=[];var tables=[];ids.forEach(id=>{var number=id.startsWith(TABLE_PREFIX)?Number(id.slice(TABLE_PREFIX.length)):NaN;if(Number.isInteger(number)){tables.push(number);}else{tokens.push(id);}});if(tables.length!=0){tables.sort((a,b)=>a-b);var ranges=[];var start=tables[0];for(var i=1;i<=tables.length;i++){if(i==tables.length||tables[i]!=tables[i-1]+1){ranges.push(start==tables[i-1]?start:start+"-"+tables[i-1]);start=tables[i];}};tokens.push("t"+ranges.join("."));};return tokens.join(",");};function decode_hash_state(hash){var ids=new Set();hash.split(",").forEach(token=>{if(TABLE_RANGES.test(token)){token.slice(1).split(".").forEach(range=>{var bounds=range.split("-").map(Number);var end=bounds.length>1?bounds[1]:bounds[0];for(var number=bounds[0];number<=end;number++){ids.add(TABLE_PREFIX+number);}});}else if(token!=""){ids.add(token);}});return ids;};function hash_to_state(){var hash_ids=new Set();if(location.hash.includes(toggle_non_empty_string)){hash_ids=decode_hash_state(location.hash.replace(toggle_non_empty_string,""));console.log("Starting ID count: "+hash_ids.size);};var changes=[];hash_ids.forEach(id=>{if(!hash_uuid_set.has(id)){changes.push(id);}});hash_uuid_set.forEach(id=>{if(!hash_ids.has(id)){changes.push(id);}});hash_uuid_set=hash_ids;console.log("Will toggle following IDs: "+changes.toString());changes.forEach(apply_toggle);render_elements(document);};function apply_toggle(id){if(id=="high_contrast"){toggle_contrast();}else{collapsible_toggle(id);}};var render_observer=null;if('IntersectionObserver'in window){render_observer=new IntersectionObserver(function(entries){for(var i=0;i<entries.length;i++){if(entries[i].isIntersecting){render_content(entries[i].target);}}},{rootMargin:"200px"});};var RELEASE_CONTENT_SIZE=256*1024;function render_elements(root){console.log("Observing 'to-render' elements.");var elements_to_render=Array.from(root.getElementsByClassName("to-render"));for(var i=0;i<elements_to_render.length;i++){if(render_observer===null){render_content(elements_to_render[i]);}else{render_observer.observe(elements_to_render[i]);}}};function release_content(element){if(element===null||element.classList.contains("to-render")){return;};if(element.textContent.length<RELEASE_CONTENT_SIZE){return;};console.log("Releasing decoded data of "+element.parentElement.id);element.textContent="";element.classList.add("to-render");if(render_observer!==null){render_observer.observe(element);}};function move_trailing_summary(){var trailing_summary=document.querySelector(".global-summary-trailing");if(trailing_summary===null){return;};document.body.prepend(...trailing_summary.children);trailing_summary.remove();};function embed_payload(element){var blob=element.getAttribute("data-blob");if(blob===null){return element.getAttribute("data");};return document.getElementById("blob-"+blob).textContent.trim();};var payload_blobs=new Map();async function text_payload(element){var payload=element.getAttribute("data-payload");if(payload===null){return embed_payload(element);};var script=document.getElementById("p-"+payload);if(script===null){return await payload_blobs.get(payload).text();};var data=script.textContent.trim();payload_blobs.set(payload,new Blob([data]));script.remove();return data;};function resolve_blobs(root=document){var elements=root.querySelectorAll("img[data-blob], source[data-blob]");for(var i=0;i<elements.length;i++){var elem=elements[i];elem.src="data:"+elem.getAttribute("data-mime")+";base64,"+embed_payload(elem);if(elem.tagName.toLowerCase()=="source"){elem.parentElement.load();}}};async function inflate_body(){var payload=document.getElementById("compressed-body");if(payload===null){return false;};if(!('DecompressionStream'in window)){var msg=document.createElement("p");msg.innerText="Browser does not support CompressionStream API, report can not be shown.";payload.before(msg);return false;};var html=await decode_data(payload.textContent.trim(),true);payload.insertAdjacentHTML("beforebegin",html);payload.remove();return true;};function inflate_feature(element){var feature=element.closest(".feature-filter-container");var container=feature.querySelector(".feature-container");if(container.inflated===undefined){container.inflated=inflate_container(container);};return container.inflated;};function feature_id_of(element){return element.closest(".feature-filter-container").id;};function feature_container(feature_id){return document.querySelector('section.feature-filter-container[id="'+feature_id+'"] > div.feature-container');};async function inflate_container(container){var payload=container.querySelector("script.feature-payload");if(payload===null){return;};var feature_id=feature_id_of(container);if(!('DecompressionStream'in window)){container.innerText="Browser does not support CompressionStream API, scenarios can not be shown.";return;};console.log("Inflating scenarios of FeatureID "+feature_id);container.innerHTML=await decode_data(payload.textContent.trim(),true);container.classList.remove("lazy");delete scenario_models[feature_id];feature_scenarios(feature_id);resolve_blobs(container);render_elements(container);container.querySelectorAll(".embed-button, tbody[id]").forEach(elem=>{var id=elem.classList.contains("embed-button")?elem.id.slice("embed_button_".length):elem.id;if(hash_uuid_set.has(id)){collapsible_toggle(id);}});if(document.querySelector('input[type="checkbox"]#scenario-filter:checked, input[type="checkbox"]#tag-filter:checked')!==null){filter_scenarios("",[feature_id]);};if(document.querySelector('input[type="checkbox"]#scenario-filter-'+feature_id+':checked')!==null){filter_feature_scenarios(feature_id);};virtualize_feature(container);};function inflate_features(){var containers=document.querySelectorAll(".feature-container.lazy");return Promise.all(Array.from(containers).map(inflate_feature));};async function init_page(){var inflated=await inflate_body();if(location.hash.includes(toggle_non_empty_string)){await inflate_features();};move_trailing_summary();create_feature_buttons();build_tag_filter();resolve_blobs();hash_to_state();document.querySelectorAll("div.feature-container").forEach(virtualize_feature);if(inflated){body_onload();}};const FEATURE_BUTTONS=[["Expand All","expand_all"],["Collapse All","collapse_all"],["Expand All Failed","expand_all_failed"],];function create_feature_buttons(){document.querySelectorAll(".feature-buttons:empty").forEach(block=>{FEATURE_BUTTONS.forEach(([label,action])=>{var button=document.createElement("span");button.className="button display-block";button.dataset.expand=action;button.textContent=label;block.append(button);});});};const DOWNLOAD_HANDLERS={download_embed:download_embed,download_plaintext:download_plaintext,};function delegated_target(event,selector,handler_attribute){var target=event.target.closest(selector);if(target===null||target.hasAttribute(handler_attribute)){return null;};return target;};function delegate_click(event){var target=delegated_target(event,".scenario-name, .embed-button, table.table > thead, [data-toggle], [data-expand], [data-download]","onclick");if(target===null){return;};if(target.classList.contains("scenario-name")){expand_this_only(target);}else if(target.classList.contains("embed-button")){toggle_hash(target.id.slice("embed_button_".length));}else if(target.tagName=="THEAD"){var table_body=target.nextElementSibling;if(table_body!==null&&table_body.id){toggle_hash(table_body.id);}}else if(target.dataset.toggle!==undefined){toggle_hash(target.dataset.toggle);}else if(target.dataset.expand!==undefined){expander(target.dataset.expand,target);}else if(target.dataset.download in DOWNLOAD_HANDLERS){var embed=target.closest(".embed-content");DOWNLOAD_HANDLERS[target.dataset.download](embed.id,target.dataset.filename);}};function delegate_change(event){var target=delegated_target(event,'input[type="checkbox"][id^="scenario-filter-"]',"onchange");if(target!==null){filter_scenarios_by_status(target);}};document.addEventListener("DOMContentLoaded",init_page);document.addEventListener("click",delegate_click);document.addEventListener("change",delegate_change);window.onhashchange=hash_to_state;function toggle_hash(id){console.log("Toggle ID: "+id);if(!hash_uuid_set.delete(id)){hash_uuid_set.add(id);};apply_toggle(id);if(!hash_update_pending){hash_update_pending=true;requestAnimationFrame(update_hash);}};function update_hash(){hash_update_pending=false;var hash="#";if(hash_uuid_set.size!=0){hash=toggle_non_empty_string+encode_hash_state(hash_uuid_set);};console.log("New hash: "+hash);history.replaceState(undefined,undefined,hash);};function collapsible_toggle(id){console.log("Toggle embed: "+id);var embed_button_id="embed_button_"+id;var button=find_element(embed_button_id);if(button===null){var elem=find_element(id);if(elem!=null){toggle_class(elem,"collapse");};return;};toggle_class(button,"collapse");var embed_content_id="embed_"+id;var elem=find_element(embed_content_id);var compressed_data=elem.querySelector("span.to-render");if(compressed_data){render_content(compressed_data)};toggle_class(elem,"collapse");if(elem.classList.contains("collapse")){release_content(elem.querySelector('span[compressed="true"]'));}};async function expander(action,summary_block){await inflate_feature(summary_block);var feature_id=summary_block.parentElement.parentElement.dataset.featureId;console.log("Doing "+action+" on FeatureID "+feature_id);feature_scenarios(feature_id).forEach(scenario=>{var collapse=action=="collapse_all"||(action=="expand_all_failed"&&scenario.header.classList.contains("passed"));scenario.header.classList.toggle("collapse",collapse);scenario.capsule.classList.toggle("collapse",collapse);});refresh_blocks();};function expand_this_only(name){var id=name.closest(".scenario-filter-container").id;var capsule=document.getElementById(id+"-c");var header=document.getElementById(id+"-h");if(header.classList.contains("collapse")){header.classList.remove("collapse");capsule.classList.remove("collapse");}else{header.classList.add("collapse");capsule.classList.add("collapse");}};function toggle_class(elem,class_name){if(elem.classList.contains(class_name)){elem.classList.remove(class_name);}else{elem.classList.add(class_name)}};function toggle_contrast(){if(document.body.classList.contains("contrast")){document.body.classList.remove("contrast");}else{document.body.classList.add("contrast");}};function detect_dark_mode(){return window.matchMedia&&window.matchMedia('(prefers-color-scheme: dark)').matches;};function invert_thm_name(theme){if(theme=="dark"){return"light";};if(theme=="light"){return"dark";};return undefined;};function format_thm_name(theme){if(theme=="dark"){return"Dark mode";};if(theme=="light"){return"Light mode";};if(theme=="auto"){return"Default mode";};return undefined;};function set_theme(theme){document.querySelector("html").setAttribute("data-theme",theme);localStorage.setItem("theme",theme);};function toggle_dark_mode(){var current=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current);var next_thm=dark_mode_toggle.dataset.nextValue;dark_mode_toggle.dataset.value=next_thm;if(next_thm=="auto"){dark_mode_toggle.dataset.nextValue=current_inv;set_theme(current);}else{console.log(current+" "+next_thm);if(current==next_thm){dark_mode_toggle.dataset.nextValue="auto";}else{next_inv=invert_thm_name(next_thm);dark_mode_toggle.dataset.nextValue=next_inv;};set_theme(next_thm);};dark_mode_toggle.innerText=format_thm_name(dark_mode_toggle.dataset.nextValue);};function dark_mode_change(){console.log("called");var current_thm=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current_thm);var value_thm=dark_mode_toggle.dataset.value;if(value_thm=="auto"){dark_mode_toggle.dataset.nextValue=current_inv;set_theme(current_thm);}else{if(current_thm==value_thm){dark_mode_toggle.dataset.nextValue="auto";}else{dark_mode_toggle.dataset.nextValue=invert_thm_name(value_thm);}};dark_mode_toggle.innerText=format_thm_name(dark_mode_toggle.dataset.nextValue);};function detect_contrast(){var obj_div=document.createElement("div");obj_div.style.color="rgb(31, 41, 59)";document.body.appendChild(obj_div);var col=document.defaultView?document.defaultView.getComputedStyle(obj_div,null).color:obj_div.currentStyle.color;document.body.removeChild(obj_div);col=col.replace(/ /g,"");if(col!=="rgb(31,41,59)"){console.log("High Contrast theme detected.");toggle_contrast();}};function body_onload(){detect_contrast();var dark_mode_matcher=window.matchMedia?window.matchMedia('(prefers-color-scheme: dark)'):null;if(dark_mode_matcher){dark_mode_matcher.onchange=dark_mode_change};var dark_mode_toggle=document.getElementById("dark_mode_toggle");var current_thm=detect_dark_mode()?"dark":"light";var current_inv=invert_thm_name(current_thm);dark_mode_toggle.dataset.nextValue=current_inv;dark_mode_toggle.innerText=format_thm_name(current_inv);set_theme(current_thm);};var element=document.createElement('div');var entity=/&(?:#x[a-f0-9]+|#[0-9]+|[a-z0-9]+);?/ig;function decodeHTMLEntities(str){str=str.replace(entity,function(m){element.innerHTML=m;return element.textContent;});element.textContent='';return str;};async function download_embed(id,filename){var elem=document.getElementById(id);var child=elem.children[1];var value="";var tag=child.tagName.toLowerCase();if(tag==="span"){extension=".txt";if(child.getAttribute("mime").indexOf("html")!=-1||child.getAttribute("mime").indexOf("markdown")!=-1){extension=".html"};var codec=child.getAttribute("codec");if(child.getAttribute("compressed")=="true"&&codec===null){extension=extension+".gz";value=GZIP_HEADER+await text_payload(child);}else if(child.getAttribute("compressed")=="true"){var text=await decode_data(await text_payload(child),true,codec);value=URL.createObjectURL(new Blob([text]));}else{value="data:text/html,"+encodeURIComponent(decodeHTMLEntities(child.innerHTML));}}else if(tag=="video"){extension=".webm";value=child.children[0].src;}else if(tag=="img"){extension=".png";value=child.src;}else{extension=".html";value=decodeHTMLEntities(child.innerHTML);};var extend_filename=!filename.match(/\.[a-zA-Z][a-zA-Z][a-zA-Z]?$/g);if(extend_filename){filename+=extension;};var link=document.createElement("a");link.style.display="none";link.href=value;link.download=filename;document.body.appendChild(link);link.click();setTimeout(function(){document.body.removeChild(link);},2000);};function download_plaintext(id,filename){var elem=document.getElementById(id);var child=elem.children[1];var value="";var tag=child.tagName.toLowerCase();extension=".txt";value="data:text/plain,"+encodeURIComponent(decodeHTMLEntities(child.textContent));var extend_filename=!filename.match(/\.[a-zA-Z][a-zA-Z][a-zA-Z]?$/g);if(extend_filename){filename+=extension;};var link=document.createElement("a");link.style.display="none";link.href=value;link.download=filename;document.body.appendChild(link);link.click();setTimeout(function(){document.body.removeChild(link);},2000);};async function render_content(element){if(!element.classList.contains("to-render")){return;};element.classList.remove("to-render");if(render_observer!==null){render_observer.unobserve(element);};var show=element.getAttribute("show");var compressed=element.getAttribute("compressed");var data=await text_payload(element);var ds=('DecompressionStream'in window);if(show=="true"&&(compressed!="true"||ds)){data=await decode_data(data,compressed=="true",element.getAttribute("codec")||"gzip");var mime=element.getAttribute("mime");if(mime.indexOf("html")>=0||mime.indexOf("markdown")>=0){element.innerHTML=data;}else{await insert_text(element,data);}}else{var msg="click download above.";if(show=="true"){msg="Browser does not support CompressionStream API, "+msg;}else{msg="Compressed data are too big, "+msg;};element.innerText=msg;}};var scenario_models={};function feature_scenarios(feature_id){if(scenario_models[feature_id]===undefined){var container=feature_container(feature_id);if(container===null){return[];};var sections=container.querySelectorAll(".scenario-filter-container");scenario_models[feature_id]=Array.from(sections).map(section=>({id:section.id,section:section,header:section.querySelector(".scenario-header"),capsule:section.querySelector(".scenario-capsule"),}));};return scenario_models[feature_id];};var scenario_index=null;function get_scenario_index(){if(scenario_index===null){var elem=document.getElementById("scenario-index");scenario_index={scenarios:[],status:{},tag:{},feature:{}};if(elem!==null){scenario_index=JSON.parse(elem.textContent);}};return scenario_index;};function indexed_scenarios(group,keys){if(keys.length==0){return null;};var positions=new Set();keys.forEach(key=>(group[key]||[]).forEach(position=>positions.add(position)));return positions;};function build_tag_filter(){var row=document.querySelector(".tag-filter");if(row===null){return;};var tags=Object.keys(get_scenario_index().tag).sort();if(tags.length==0){row.remove();return;};for(var i=0;i<tags.length;i++){var input=document.createElement("input");input.type="checkbox";input.id="tag-filter";input.value=tags[i];input.onchange=filter_global_scenarios_by_status;var label=document.createElement("label");label.className="global-summary-status";label.append(input,"@"+tags[i]+" ("+scenario_index.tag[tags[i]].length+") ");row.append(label);}};var VIRTUAL_SCENARIOS=200;var VIRTUAL_BLOCK_SIZE=50;var detached_blocks=new Set();var virtual_observer=null;if('IntersectionObserver'in window){virtual_observer=new IntersectionObserver(function(entries){var detach=entries.filter(entry=>!entry.isIntersecting&&!detached_blocks.has(entry.target));var heights=detach.map(entry=>entry.target.offsetHeight);for(var i=0;i<detach.length;i++){detach_block(detach[i].target,heights[i]);};entries.filter(entry=>entry.isIntersecting).forEach(entry=>attach_block(entry.target));},{rootMargin:"1000px 0px"});};function virtualize_feature(container){if(virtual_observer===null||container.classList.contains("lazy")){return;};var sections=Array.from(container.querySelectorAll(":scope > .scenario-filter-container"));if(sections.length<VIRTUAL_SCENARIOS){return;};var feature_id=feature_id_of(container);console.log("Virtualizing scenarios of FeatureID "+feature_id);feature_scenarios(feature_id);for(var i=0;i<sections.length;i+=VIRTUAL_BLOCK_SIZE){var block=document.createElement("div");block.className="scenario-block";sections[i].before(block);block.append(...sections.slice(i,i+VIRTUAL_BLOCK_SIZE));virtual_observer.observe(block);}};function detach_block(block,height){block.style.height=height+"px";block.fragment=document.createDocumentFragment();block.fragment.append(...block.childNodes);detached_blocks.add(block);};function attach_block(block){if(!detached_blocks.has(block)){return;};block.append(block.fragment);block.fragment=null;block.style.height="";detached_blocks.delete(block);};function refresh_blocks(){for(var block of Array.from(detached_blocks)){attach_block(block);virtual_observer.unobserve(block);virtual_observer.observe(block);}};function find_element(id){var elem=document.getElementById(id);for(var block of detached_blocks){if(elem!==null){break;};elem=block.fragment.getElementById(id);};return elem;};function attach_element(elem){for(var block of Array.from(detached_blocks)){if(block.fragment.contains(elem)){attach_block(block);}}};var search_index=null;var SEARCH_TOKEN=/[\p{L}\p{N}_]{2,}/gu;var MAX_SEARCH_RESULTS=100;function get_search_index(){if(search_index===null){var elem=document.getElementById("search-index");search_index=Promise.resolve({names:[],targets:[],tokens:{}});if(elem!==null){search_index=decode_data(elem.textContent.trim(),true).then(JSON.parse);}};return search_index;};async function search_report(query){var results=document.getElementById("search-results");results.textContent="";var words=query.toLowerCase().match(SEARCH_TOKEN)||[];if(words.length==0){return;};var index=await get_search_index();var tokens=Object.keys(index.tokens);var matched=null;words.forEach(word=>{var positions=new Set();tokens.filter(token=>token.startsWith(word)).forEach(token=>index.tokens[token].forEach(position=>positions.add(position)));if(matched!==null){positions=new Set(Array.from(matched).filter(position=>positions.has(position)));};matched=positions;});var positions=Array.from(matched).sort((a,b)=>a-b);console.log("Search '"+query+"' matches: "+positions.length);results.append("Matches: "+positions.length);positions.slice(0,MAX_SEARCH_RESULTS).forEach(position=>{var target=index.targets[position];var item=document.createElement("div");item.className="search-result";item.innerText=index.names[target[0]];if(target.length>1){item.innerText+=" - "+(target[2]||"Embed");};item.onclick=()=>show_search_result(target);results.append(item);});};async function show_search_result(target){var scenario_id=get_scenario_index().scenarios[target[0]];var feature_id=scenario_id.split("-")[0];await inflate_feature(feature_container(feature_id));var scenario=feature_scenarios(feature_id).find(scenario=>scenario.id==scenario_id);if(scenario===undefined){return;};attach_element(scenario.section);scenario.header.classList.remove("collapse");scenario.capsule.classList.remove("collapse");var elem=scenario.section;if(target.length>1){var embed=find_element("embed_"+target[1]);if(embed!==null){if(embed.classList.contains("collapse")){toggle_hash(target[1]);};elem=embed;}};elem.scrollIntoView({block:"center"});};function filter_features_by_status(){const checkboxes=document.querySelectorAll('input[type="checkbox"]#feature-filter');const selectedClasses=Array.from(checkboxes).filter(checkbox=>checkbox.checked).map(checkbox=>checkbox.value);console.log("Filtering Features: "+selectedClasses);const items=document.querySelectorAll('.feature-filter-container');items.forEach(item=>{const matches=selectedClasses.some(className=>item.classList.contains(className));item.style.display=selectedClasses.length===0||matches?'':'none';});};async function filter_scenarios_by_status(this_block){await inflate_feature(this_block);var element=this_block;while(element&&!element.dataset.featureId){element=element.parentElement};filter_feature_scenarios(element.dataset.featureId);};function filter_feature_scenarios(feature_id){console.log("Filtering Scenarios of Feature: "+feature_id);filter_scenarios("-"+feature_id,[feature_id]);};function filter_global_scenarios_by_status(){console.log("Filtering All Scenarios of All Features");filter_scenarios("",Object.keys(get_scenario_index().feature));};function selected_values(checkbox_selector){return Array.from(document.querySelectorAll(checkbox_selector)).filter(checkbox=>checkbox.checked).map(checkbox=>checkbox.value);};function filter_scenarios(filter_suffix,feature_ids){const index=get_scenario_index();const selectedClasses=selected_values('input[type="checkbox"]#scenario-filter'+filter_suffix);const statuses=indexed_scenarios(index.status,selectedClasses);var tags=null;if(filter_suffix==""){tags=indexed_scenarios(index.tag,selected_values('input[type="checkbox"]#tag-filter'));};console.log("Selected statuses: "+selectedClasses);feature_ids.forEach(feature_id=>{const range=index.feature[feature_id]||[0,0];const sections={};feature_scenarios(feature_id).forEach(scenario=>sections[scenario.id]=scenario.section);for(var position=range[0];position<range[1];position++){const section=sections[index.scenarios[position]];if(section===undefined){continue;};const hidden=(statuses!==null&&!statuses.has(position))||(tags!==null&&!tags.has(position));section.classList.toggle("filtered-out",hidden);}});refresh_blocks();};window.onscroll=function(){scroll_function()};function scroll_function(){let return_button=document.getElementById("return_to_the_top_button");if(return_button==null){return;};if(document.body.scrollTop>300||document.documentElement.scrollTop>300){return_button.classList.add("show");}else{return_button.classList.remove("show");}};function return_to_the_top(){document.body.scrollTo({top:0,behavior:'smooth'});document.documentElement.scrollTo({top:0,behavior:'smooth'});};
\ No newline at end of file
@@ -0,0 +1,400 @@
+"""
+Fast renderer of scenarios for PrettyHTMLFormatter.
+
+Emits the same markup as the dominate tags of Scenario and Step (rendered
+condensed) straight from string templates, without building a tree of tag
+objects for every step, table cell and embed.
+"""
+
+from behave.model_core import Status
+
+from .payload import escaped_writer, payload_size, raw_writer
+
+HIGH_CONTRAST_STATUS = {
+    "passed": "PASS",
+    "failed": "FAIL",
+    "error": "ERROR",
+    "undefined": "SKIP",
+    "skipped": "SKIP",
+    "untested": "SKIP",
+}
+
+
+def escape(value):
+    """
+    Escape text or attribute value, the same way as dominate.
+    """
+    return (
+        str(value)
+        .replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
+def render_attributes(attributes):
+    """
+    Render attributes given as dominate keyword arguments, sorted as dominate does.
+    """
+    rendered = {}
+    for name, value in attributes.items():
+        if value is None or value is False:
+            continue
+        key = "class" if name == "cls" else name
+        if key.startswith(("data_", "aria_")):
+            key = key.replace("_", "-")
+        rendered[key] = value
+    return "".join(
+        f' {name}="{escape(value)}"' for name, value in sorted(rendered.items())
+    )
+
+
+class FastRenderer:
+    """
+    Renders scenarios to string, used instead of dominate if configured.
+    """
+
+    def __init__(self, formatter):
+        self.formatter = formatter
+
+    def render_scenarios(self, scenarios):
+        """
+        Render all scenarios of the feature.
+        """
+        parts = []
+        for scenario in scenarios:
+            self.render_scenario(parts, scenario)
+        return "".join(parts)
+
+    def render_scenario(self, parts, scenario):
+        """
+        Render scenario, same as Scenario.generate_scenario().
+        """
+        formatter = self.formatter
+        out = parts.append
+
+        # Check for after_scenario errors.
+        scenario.report_error(scenario._scenario)
+
+        status = scenario.status.name
+        common_cls = f"{status} {formatter.get_collapse_cls('scenario')}"
+        scenario_id = f"f{scenario.feature.counter}-s{scenario.counter}"
+
+        out(
+            f'<section class="scenario-filter-container {status}" id="{scenario_id}">'
+            f'<div class="scenario-header {common_cls}" id="{scenario_id}-h">',
+        )
+        for tag in scenario.tags:
+            if tag.has_link():
+                out(
+                    f'<div class="scenario-tags"><a href="{escape(tag.link)}">'
+                    f"@{escape(tag.behave_tag)}</a></div>",
+                )
+            else:
+                out(
+                    f'<div class="scenario-tags"><span>@{escape(tag.behave_tag)}'
+                    "</span></div>",
+                )
+        name_attributes = render_attributes(
+            formatter.inline_attributes(
+                {"id": scenario_id, "onclick": "expand_this_only(this)"},
+            ),
+        )
+        out(
+            '<div class="scenario-info">'
+            f'<div class="scenario-name"{name_attributes}>'
+            f"Scenario: {escape(scenario.name)}</div>"
+            '<div class="scenario-duration">'
+            f"Scenario duration: {scenario.duration:.2f}s</div>"
+            "</div></div>"
+            f'<div class="scenario-capsule {common_cls}" id="{scenario_id}-c">',
+        )
+
+        # Add scenario description as "commentary":
+        scenario_description = "\n".join(scenario._scenario.description)
+        if scenario_description:
+            out(
+                '<pre class="step-capsule description no-margin-top">'
+                f"{escape(scenario_description)}</pre>",
+            )
+
+        for step in scenario.all_steps:
+            self.render_step(parts, step, scenario.status)
+
+        out("</div></section>")
+
+    def render_step(self, parts, step, scenario_status):
+        """
+        Render step, same as Step.generate_step().
+        """
+        formatter = self.formatter
+        out = parts.append
+
+        if step.status is Status.untested:
+            if not formatter.show_unexecuted_steps:
+                return
+            step.status = Status.skipped
+
+        margin_top_cls = "margin-top" if step.margin_top else ""
+
+        if step.commentary_override:
+            out(
+                f'<pre class="step-capsule commentary {margin_top_cls}">'
+                f"{escape(step.text)}</pre>",
+            )
+
+        else:
+            status_name = step.status.name
+            if status_name not in HIGH_CONTRAST_STATUS:
+                status_name = "undefined"
+
+            out(
+                f'<div class="step-capsule {step.status.name} {margin_top_cls}">'
+                f'<div class="step-status">{HIGH_CONTRAST_STATUS[status_name]}</div>'
+                '<div class="step-decorator">'
+                f"<b><i>{escape(step.keyword + ' ')}</i></b>",
+            )
+            self.render_bold_text(parts, step.name)
+            out(f'</div><div class="step-duration">({step.duration:.2f}s)</div>')
+
+            # Make the link only when the link is provided.
+            if step.location_link:
+                out(
+                    f'<a class="flex-left-space" href="{escape(step.location_link)}">'
+                    f"{escape(step.location)}</a></div>",
+                )
+            else:
+                out(
+                    f'<span class="flex-left-space">{escape(step.location)}</span>'
+                    "</div>",
+                )
+
+            # Still in non-commentary.
+            self.render_text(parts, step)
+            self.render_table(parts, step)
+
+        out('<div class="embeds">')
+        for embed_data in step.embeds:
+            if embed_data.fail_only and scenario_status != Status.failed:
+                continue
+            self.render_embed(parts, step, embed_data)
+        out("</div>")
+
+    @staticmethod
+    def render_bold_text(parts, given_string):
+        """
+        Render text with bold parts in between quotes, as make_bold_text().
+        """
+        out = parts.append
+        the_rest = given_string
+        for _ in range(int(given_string.count('"') / 2)):
+            first_part, bold_text, the_rest = the_rest.split('"', 2)
+            out(
+                f"<span>{escape(first_part)}</span><b>&quot;{escape(bold_text)}&quot;</b>",
+            )
+        out(f"<span>{escape(the_rest)}</span>")
+
+    def render_text(self, parts, step):
+        """
+        Render step text, same as Step.generate_text().
+        """
+        if not step.text:
+            return
+
+        formatter = self.formatter
+        table_number = formatter.table_number
+        out = parts.append
+        out('<table class="table">')
+        if formatter.collapse_text:
+            out(
+                f"<thead{self.render_thead_attributes(table_number)}>"
+                "<tr><th>Text</th></tr></thead>",
+            )
+        out(
+            f'<tbody class="{formatter.get_collapse_cls("text")}" '
+            f'id="table_{table_number}">',
+        )
+        out(
+            "".join(
+                f"<tr><td>{escape(row)}</td></tr>" for row in step.text.split("\n")
+            ),
+        )
+        out("</tbody></table>")
+
+        type(formatter).table_number += 1
+
+    def render_table(self, parts, step):
+        """
+        Render step table, same as Step.generate_table().
+        """
+        if not step.table:
+            return
+
+        formatter = self.formatter
+        table_number = formatter.table_number
+        out = parts.append
+        out(
+            '<table class="table">'
+            f"<thead{self.render_thead_attributes(table_number)}><tr>",
+        )
+        out("".join(f"<th>{escape(heading)}</th>" for heading in step.table.headings))
+        out(
+            "</tr></thead>"
+            f'<tbody class="{formatter.get_collapse_cls("table")}" '
+            f'id="table_{table_number}">',
+        )
+        for row in step.table.rows:
+            out("<tr>")
+            out("".join(f"<td>{escape(cell)}</td>" for cell in row))
+            out("</tr>")
+        out("</tbody></table>")
+
+        type(formatter).table_number += 1
+
+    def render_thead_attributes(self, table_number):
+        """
+        Render attributes of collapsible table head.
+        """
+        return render_attributes(
+            self.formatter.inline_attributes(
+                {"onclick": f"toggle_hash('table_{table_number}')"},
+            ),
+        )
+
+    def render_embed(self, parts, step, embed_data):
+        """
+        Render embed, same as Step.generate_embed().
+        """
+        formatter = self.formatter
+        out = parts.append
+
+        use_caption, _ = step.get_embed_caption(embed_data)
+
+        encoded = step.get_encoded(formatter, embed_data)
+
+        collapse_cls = formatter.get_collapse_cls("embed")
+        uuid = embed_data.uuid
+        button_attributes = render_attributes(
+            formatter.inline_attributes({"onclick": f"toggle_hash('{uuid}')"}),
+        )
+        out(
+            '<div class="messages"><div class="embed-capsule">'
+            f'<div class="embed-button {collapse_cls}" id="embed_button_{uuid}"'
+            f"{button_attributes}>{escape(use_caption)}</div>"
+            f'<pre class="embed-content {collapse_cls}" id="embed_{uuid}">',
+        )
+
+        buttons, in_flex = step.get_download_buttons(
+            embed_data,
+            encoded.data,
+            encoded.compress,
+        )
+        if in_flex:
+            out('<div class="display-flex flex-gap">')
+        for label, func in buttons:
+            download_attributes = render_attributes(
+                step.get_download_attributes(
+                    formatter,
+                    func,
+                    embed_data,
+                    use_caption,
+                    embed_data.filename,
+                ),
+            )
+            out(
+                f'<span class="button margin-bottom"{download_attributes}>'
+                f"{label}</span>",
+            )
+        if in_flex:
+            out("</div>")
+
+        self.render_embed_content(parts, step, encoded)
+        out("</pre></div></div>")
+
+    def render_embed_content(self, parts, step, encoded):
+        """
+        Render content of the embed, same as Step.generate_embed_content().
+        """
+        formatter = self.formatter
+        out = parts.append
+        mime_type = encoded.mime_type
+        data = encoded.data
+
+        if "video/webm" in mime_type:
+            source_attributes = render_attributes(
+                {
+                    "type": mime_type,
+                    **step.get_binary_source(
+                        formatter,
+                        mime_type,
+                        data,
+                        encoded.asset,
+                    ),
+                },
+            )
+            out(f'<video controls="" width="1024"><source{source_attributes}></video>')
+
+        if "image/png" in mime_type:
+            img_attributes = render_attributes(
+                step.get_binary_source(formatter, mime_type, data, encoded.asset),
+            )
+            out(f"<img{img_attributes}>")
+
+        if "text" in mime_type:
+            self.render_text_content(parts, step, encoded)
+
+        if "link" in mime_type:
+            # expected format: set( [link, label], ... )
+            for single_link in data:
+                out(
+                    f'<div><a href="{escape(single_link[0])}">'
+                    f"{escape(single_link[1])}</a></div>",
+                )
+
+    def render_text_content(self, parts, step, encoded):
+        """
+        Render text content of the embed, compressed if requested.
+        """
+        formatter = self.formatter
+        payload_writer = formatter.payload_writer
+        out = parts.append
+        mime_type = encoded.mime_type
+        is_html = "html" in mime_type or "markdown" in mime_type
+        data = encoded.content
+        compress = encoded.compress
+
+        if encoded.error is not None:
+            # Fallback for problematic data
+            out(
+                '<span mime="text/plain">'
+                f"Data encoding error: {escape(encoded.error)}</span>",
+            )
+        elif compress:
+            # Performance optimization: limit what we show inline
+            max_inline_size = 1024 * 1024  # 1MB
+            show = payload_size(data) < max_inline_size or is_html
+
+            span_attributes = render_attributes(
+                {
+                    "cls": "to-render",
+                    "show": str(show).lower(),
+                    "compressed": "true",
+                    "mime": mime_type,
+                    **step.get_compressed_source(
+                        formatter,
+                        data,
+                        encoded.encoded,
+                        compress,
+                    ),
+                },
+            )
+            out(f"<span{span_attributes}></span>")
+        elif is_html:
+            out(
+                f'<span mime="{escape(mime_type)}">'
+                f"{payload_writer.inline(data, raw_writer)}</span>",
+            )
+        else:
+            text = escape(payload_writer.inline(data, escaped_writer))
+            out(f'<span mime="{escape(mime_type)}">{text}</span>')
@@ -10,23 +10,32 @@ Inspired by https://github.com/Hargne/jest-html-reporter
 from __future__ import absolute_import
 
 import atexit
-import base64
-import gzip
+import cProfile
+import functools
+import json
+import os
 import time
 import traceback
+import urllib.parse
 import uuid
 from collections import OrderedDict
+from concurrent.futures import (
+    BrokenExecutor,
+    CancelledError,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from datetime import datetime
 from pathlib import Path
 
 import dominate
-import markdown
 from behave.formatter.base import Formatter
 from behave.model_core import Status
 from behave.runner_util import make_undefined_step_snippets
 from dominate.tags import (
     a,
     b,
+    details,
     div,
     h2,
     i,
@@ -40,6 +49,7 @@ from dominate.tags import (
     source,
     span,
     style,
+    summary,
     table,
     tbody,
     td,
@@ -50,6 +60,35 @@ from dominate.tags import (
 )
 from dominate.util import raw
 
+from .fast_renderer import FastRenderer
+from .payload import (
+    COMPRESSION_CODECS,
+    COMPRESSION_LEVELS,
+    EMBED_COMPRESSION_THRESHOLD,
+    MAX_INLINE_TEXT_SIZE,
+    STREAM_ENCODE_THRESHOLD,
+    BlobStore,
+    Compression,
+    EmbedSpool,
+    EncodeCache,
+    GzipBase64Stream,
+    PayloadWriter,
+    SpooledPayload,
+    TrailingPayloads,
+    compress_text,
+    embed_file_path,
+    encode_embed,
+    escaped_writer,
+    gzip_base64_writer,
+    is_embed_file,
+    payload_lines,
+    payload_size,
+    raw_writer,
+)
+from .search import SearchIndex
+from .shard import dump_feature, dump_footer, dump_header, shard_line
+from .timing import measure, merge_timings, timed, timings_report
+
 # Constants for better maintainability
 DEFAULT_CAPTION_FOR_MIME_TYPE = {
     "video/webm": "Video",
@@ -63,10 +102,15 @@ EXPECTED_STATUSES = (
     Status.skipped,
     Status.undefined,
 )
-EMBED_COMPRESSION_THRESHOLD = 48 * 1024  # 48KB
-MAX_FILENAME_LENGTH = 256
 MIN_UUID_LENGTH = 8  # Reduced collision probability
 LINK_PAIR_SIZE = 2
+RENDERERS = ["dominate", "fast"]
+ENCODE_EXECUTORS = {
+    "process": ProcessPoolExecutor,
+    "thread": ThreadPoolExecutor,
+}
+DIAGNOSTICS = ["json", "html"]
+EMBED_STORAGES = ["inline", "external"]
 
 
 class Feature:
@@ -94,6 +138,9 @@ class Feature:
         self.scenario_begin_timestamp = time.time()
         self.before_scenario_duration = 0.0
 
+        # Statuses of scenarios, kept after the feature is released.
+        self._released_statuses = None
+
     def add_background(self, background):
         """
         Save steps common for all scenarios in feature.
@@ -203,6 +250,52 @@ class Feature:
 
         return stats
 
+    @property
+    def scenario_statuses(self):
+        """
+        Statuses of all scenarios, also available after release().
+        """
+        if self._released_statuses is not None:
+            return self._released_statuses
+
+        return [scenario.status for scenario in self.scenarios]
+
+    def iter_embeds(self):
+        """
+        Iterate over embeds of all (pseudo) steps in document order.
+        """
+        for scenario in self.scenarios:
+            for step in scenario.all_steps:
+                yield from step.embeds
+
+    def release(self):
+        """
+        Drop scenarios, steps and embeds once the feature was written out.
+        Only the scenario statuses are kept for the global summary.
+        """
+        self._released_statuses = self.scenario_statuses
+        for embed_data in self.iter_embeds():
+            embed_data.discard_spooled()
+        self.scenarios = []
+        self._background = None
+        self.to_embed = []
+
+    def index_scenarios(self, index, search_index=None):
+        """
+        Add scenarios to the index of scenario IDs by status, tag and feature.
+        Scenarios are referenced by their position in the list of scenario IDs.
+        """
+        start = len(index["scenarios"])
+        for position, scenario in enumerate(self.scenarios, start):
+            if search_index is not None:
+                search_index.add_scenario(position, scenario)
+            index["scenarios"].append(f"f{self.counter}-s{scenario.counter}")
+            index["status"].setdefault(scenario.status.name, []).append(position)
+            # Feature tags can be repeated in scenario tags.
+            for tag in dict.fromkeys(tag.behave_tag for tag in scenario.tags):
+                index["tag"].setdefault(tag, []).append(position)
+        index["feature"][f"f{self.counter}"] = [start, len(index["scenarios"])]
+
     def generate_feature(self, formatter):
         """
         Converts this object to HTML.
@@ -212,9 +305,12 @@ class Feature:
         with section(
             cls=f"feature-filter-container {self.status.name}",
             id=f"f{self.counter}",
-        ):
+        ) as feature_section:
             # Feature Title.
-            with div(cls="feature-title flex-gap", id=f"f{self.counter}"):
+            with div(
+                cls="feature-title flex-gap",
+                **formatter.inline_attributes({"id": f"f{self.counter}"}),
+            ):
                 # Generate icon if present.
                 if self.icon:
                     with div(cls="feature-icon"):
@@ -235,7 +331,10 @@ class Feature:
                 span(
                     "Summary",
                     cls=f"button{left_space}",
-                    onclick=f"toggle_hash('summary-f{self.counter}')",
+                    **formatter.inline_attributes(
+                        {"onclick": f"toggle_hash('summary-f{self.counter}')"},
+                        data_toggle=f"summary-f{self.counter}",
+                    ),
                 )
 
             # Generate summary.
@@ -268,6 +367,9 @@ class Feature:
                         )
 
                     # Filter features.
+                    filter_handler = formatter.inline_attributes(
+                        {"onchange": "filter_scenarios_by_status(this)"},
+                    )
                     with div("Scenarios Filter: ", cls="feature-summary-row"):
                         for status in EXPECTED_STATUSES:
 
@@ -280,9 +382,9 @@ class Feature:
                             label(
                                 input_(
                                     type="checkbox",
-                                    onchange="filter_scenarios_by_status(this)",
                                     value=status.name.lower(),
                                     id=f"scenario-filter-f{self.counter}",
+                                    **filter_handler,
                                 ),
                                 status_formatted,
                                 cls=f"global-summary-status {status.name.lower()}",
@@ -301,23 +403,12 @@ class Feature:
                         cls="feature-summary-row",
                     )
 
-                # Generating clickable buttons for collapsing/expanding.
-                with div(cls="feature-summary-stats"):
-                    span(
-                        "Expand All",
-                        cls="button display-block",
-                        onclick="expander('expand_all', this)",
-                    )
-                    span(
-                        "Collapse All",
-                        cls="button display-block",
-                        onclick="expander('collapse_all', this)",
-                    )
-                    span(
-                        "Expand All Failed",
-                        cls="button display-block",
-                        onclick="expander('expand_all_failed', this)",
-                    )
+                # Generating clickable buttons for collapsing/expanding,
+                # compact markup has them created by javascript.
+                if formatter.compact_markup:
+                    div(cls="feature-summary-stats feature-buttons")
+                else:
+                    self._generate_expander_buttons()
 
                 if formatter.additional_info:
                     with div(
@@ -333,10 +424,81 @@ class Feature:
                                 )
 
             # Feature data container.
-            with div(cls="feature-container", id=f"f{self.counter}"):
+            self._generate_container(formatter)
+
+        # Errors of after_scenario are embedded when scenarios are generated.
+        self.index_scenarios(formatter.scenario_index, formatter.search_index)
+
+        return feature_section
+
+    @staticmethod
+    def _generate_expander_buttons():
+        """
+        Generate buttons collapsing/expanding scenarios of the feature.
+        """
+        with div(cls="feature-summary-stats"):
+            span(
+                "Expand All",
+                cls="button display-block",
+                onclick="expander('expand_all', this)",
+            )
+            span(
+                "Collapse All",
+                cls="button display-block",
+                onclick="expander('collapse_all', this)",
+            )
+            span(
+                "Expand All Failed",
+                cls="button display-block",
+                onclick="expander('expand_all_failed', this)",
+            )
+
+    def _generate_container(self, formatter):
+        """
+        Generate container of the scenarios, compressed in lazy mode.
+        """
+        with div(
+            cls="feature-container",
+            **formatter.inline_attributes({"id": f"f{self.counter}"}),
+        ) as feature_container:
+            if formatter.fast_renderer is not None:
+                raw(formatter.fast_renderer.render_scenarios(self.scenarios))
+            else:
                 for scenario in self.scenarios:
                     scenario.generate_scenario(formatter)
 
+        # Scenarios of lazy feature are inflated by javascript when needed.
+        if formatter.lazy_features:
+            self._compress_container(feature_container, formatter)
+
+    def _compress_container(self, feature_container, formatter):
+        """
+        Replace scenarios in the feature container by compressed payload.
+        """
+        rendered = "".join(
+            child.render(pretty=formatter.pretty_output)
+            for child in feature_container.children
+        )
+        feature_container.clear()
+        feature_container["class"] += " lazy"
+        feature_container.add(
+            span(
+                f"Show scenarios: {len(self.scenarios)}",
+                cls="button",
+                onclick="inflate_feature(this)",
+            ),
+            script(
+                raw(
+                    formatter.payload_writer.register_compressed(
+                        rendered,
+                        formatter.compression.level,
+                    ),
+                ),
+                type="application/octet-stream",
+                cls="feature-payload",
+            ),
+        )
+
 
 class Scenario:
     """
@@ -419,6 +581,16 @@ class Scenario:
 
         return None
 
+    @property
+    def all_steps(self):
+        """
+        Steps including pseudo steps, in the order they are rendered.
+        """
+        if self.pseudo_steps:
+            return [self.pseudo_steps[0], *self.steps, self.pseudo_steps[1]]
+
+        return self.steps
+
     @property
     def current_step(self):
         """
@@ -589,8 +761,12 @@ class Scenario:
                     div(
                         f"Scenario: {self.name}",
                         cls="scenario-name",
-                        id=f"f{self.feature.counter}-s{self.counter}",
-                        onclick="expand_this_only(this)",
+                        **formatter.inline_attributes(
+                            {
+                                "id": f"f{self.feature.counter}-s{self.counter}",
+                                "onclick": "expand_this_only(this)",
+                            },
+                        ),
                     )
 
                     div(
@@ -611,10 +787,7 @@ class Scenario:
                         cls="step-capsule description no-margin-top",
                     )
 
-                steps = self.steps
-                if self.pseudo_steps:
-                    steps = [self.pseudo_steps[0]] + steps + [self.pseudo_steps[1]]
-                for step in steps:
+                for step in self.all_steps:
                     step.generate_step(formatter, self.status)
 
 
@@ -749,36 +922,17 @@ class Step:
                     continue
                 self.generate_embed(formatter, embed_data)
 
-    def generate_download_button(
-        self,
-        embed_data,
-        data,
-        use_caption,
-        filename,
-        compress=False,
-    ):
+    def get_download_buttons(self, embed_data, data, compress=False):
         """
-        Creates Download button in HTML.
+        Get labels and javascript functions of the download buttons.
 
-        This should not be part of Embed class, as Embed objects are
-        returned to user for later modification of data, we want to
-        prevent accidental call of this.
+        :return: (label, function) pairs and whether they are in flex container.
+        :rtype: tuple
         """
-
-        def _create_download_button(label="Download", func="download_embed"):
-            _filename = filename if filename else use_caption
-            _filename = _filename.replace("'", "\\'")
-            args = f"'embed_{embed_data.uuid}','{_filename}'"
-            onclick = f"{func}({args})"
-            span(
-                label,
-                cls="button margin-bottom",
-                onclick=onclick,
-            )
-
         # Javascript will decompress data and render them, if small enough.
-        if compress == "auto":
-            compress = len(data) > EMBED_COMPRESSION_THRESHOLD
+        # Only text is compressed, data of external assets are not in memory.
+        if compress == "auto" and "text" in embed_data.mime_type:
+            compress = payload_size(data) > EMBED_COMPRESSION_THRESHOLD
 
         # Rule for embed_data.download_button as None - default value.
         if embed_data.download_button is None:
@@ -787,92 +941,153 @@ class Step:
             min_lines_button = 20
             if (
                 "text" in embed_data.mime_type
-                and data.count("\n") < min_lines_button
-                and len(data) < 100 * min_lines_button
+                and payload_lines(data) < min_lines_button
+                and payload_size(data) < 100 * min_lines_button
                 and not compress
             ):
-                return
+                return [], False
 
             # Do not create button if the mime type is link.
             if "link" in embed_data.mime_type:
-                return
+                return [], False
 
             # In all other cases the button is valid.
-            with div(cls="display-flex flex-gap"):
-                if "html" in embed_data.mime_type or "markdown" in embed_data.mime_type:
-                    _create_download_button("Download HTML")
-                    _create_download_button("Download Plaintext", "download_plaintext")
-                else:
-                    _create_download_button()
+            if "html" in embed_data.mime_type or "markdown" in embed_data.mime_type:
+                return [
+                    ("Download HTML", "download_embed"),
+                    ("Download Plaintext", "download_plaintext"),
+                ], True
+            return [("Download", "download_embed")], True
 
         # Rule for embed_data.download_button as True.
-        elif embed_data.download_button:
+        if embed_data.download_button:
             # Create download for all cases.
-            _create_download_button()
+            return [("Download", "download_embed")], False
+
+        return [], False
 
-    def generate_embed_content(self, mime_type, data, compress):
+    @staticmethod
+    def get_download_onclick(func, embed_data, use_caption, filename):
         """
-        Generate content of the embed based on the mime_type.
+        Get onclick javascript of the download button.
+        """
+        _filename = filename if filename else use_caption
+        _filename = _filename.replace("'", "\\'")
+        return f"{func}('embed_{embed_data.uuid}','{_filename}')"
 
-        :param mime_type: Mime type of the data to embed.
-        :type mime_type: str
+    @staticmethod
+    def get_download_attributes(
+        formatter,
+        func,
+        embed_data,
+        use_caption,
+        filename,
+    ):
+        """
+        Get attributes with download handler of the download button.
+        """
+        onclick = Step.get_download_onclick(func, embed_data, use_caption, filename)
+        return formatter.inline_attributes(
+            {"onclick": onclick},
+            data_download=func,
+            data_filename=filename if filename else use_caption,
+        )
 
-        :param data: Data to be embedded.
-        :type data: Unspecified.
+    def generate_download_button(
+        self,
+        formatter,
+        embed_data,
+        data,
+        use_caption,
+        filename,
+        *,
+        compress=False,
+    ):
+        """
+        Creates Download button in HTML.
 
-        :param compress: Whether to compress the text data
-        :type data: Unspecified.
+        This should not be part of Embed class, as Embed objects are
+        returned to user for later modification of data, we want to
+        prevent accidental call of this.
         """
 
+        def _create_download_button(label, func):
+            span(
+                label,
+                cls="button margin-bottom",
+                **self.get_download_attributes(
+                    formatter,
+                    func,
+                    embed_data,
+                    use_caption,
+                    filename,
+                ),
+            )
+
+        buttons, in_flex = self.get_download_buttons(embed_data, data, compress)
+        if in_flex:
+            with div(cls="display-flex flex-gap"):
+                for label, func in buttons:
+                    _create_download_button(label, func)
+        else:
+            for label, func in buttons:
+                _create_download_button(label, func)
+
+    def generate_embed_content(self, encoded, formatter):
+        """
+        Generate content of the embed based on the mime_type.
+
+        :param encoded: Embed data prepared by encode_embed().
+        :type encoded: EncodedEmbed
+
+        :param formatter: Formatter writing the page, for spooled data.
+        :type formatter: PrettyHTMLFormatter
+        """
+
+        payload_writer = formatter.payload_writer
+        mime_type = encoded.mime_type
+        data = encoded.data
+
         # Actual Embed.
         if "video/webm" in mime_type:
             with video(width="1024", controls=""):
-                source(src=f"data:{mime_type};base64,{data}", type=mime_type)
+                source(
+                    type=mime_type,
+                    **self.get_binary_source(formatter, mime_type, data, encoded.asset),
+                )
 
         if "image/png" in mime_type:
-            img(src=f"data:{mime_type};base64,{data}")
+            img(**self.get_binary_source(formatter, mime_type, data, encoded.asset))
 
         if "text" in mime_type:
             is_html = "html" in mime_type or "markdown" in mime_type
-            if "markdown" in mime_type:
-                data = markdown.markdown(data)
-
-            # Javascript will decompress data and render them, if small enough.
-            if compress == "auto":
-                compress = len(data) > EMBED_COMPRESSION_THRESHOLD
+            data = encoded.content
+            compress = encoded.compress
 
-            if compress:
+            if encoded.error is not None:
+                # Fallback for problematic data
+                span(f"Data encoding error: {encoded.error}", mime="text/plain")
+            elif compress:
                 # Performance optimization: limit what we show inline
-                max_inline_size = 1024 * 1024  # 1MB
-                show = len(data) < max_inline_size or is_html
-
-                try:
-                    data_bytes = data.encode("utf-8")
-                    # compresslevel 0 - fastest, lowest compression
-                    # compresslevel 9 - slowest, biggest compression
-                    # Balance compression/speed with 6
-                    compressed_data = gzip.compress(data_bytes, compresslevel=6)
-                    data_base64 = (
-                        base64.b64encode(compressed_data)
-                        .decode("utf-8")
-                        .replace("\n", "")
-                    )
+                show = payload_size(data) < MAX_INLINE_TEXT_SIZE or is_html
 
-                    span(
-                        cls="to-render",
-                        data=data_base64,
-                        show=str(show).lower(),
-                        compressed=str(compress).lower(),
-                        mime=mime_type,
-                    )
-                except (UnicodeEncodeError, MemoryError) as error:
-                    # Fallback for problematic data
-                    span(f"Data encoding error: {error}", mime="text/plain")
+                span(
+                    cls="to-render",
+                    show=str(show).lower(),
+                    compressed="true",
+                    mime=mime_type,
+                    **self.get_compressed_source(
+                        formatter,
+                        data,
+                        encoded.encoded,
+                        compress,
+                    ),
+                )
             elif is_html:
                 with span(mime=mime_type):
-                    raw(data)
+                    raw(payload_writer.inline(data, raw_writer))
             else:
-                span(data, mime=mime_type)
+                span(payload_writer.inline(data, escaped_writer), mime=mime_type)
 
         if "link" in mime_type:
             # expected format: set( [link, label], ... )
@@ -880,6 +1095,59 @@ class Step:
                 with div():
                     a(single_link[1], href=single_link[0])
 
+    @staticmethod
+    def get_binary_source(formatter, mime_type, data, asset=None):
+        """
+        Attributes of img/source tag pointing to base64 encoded data.
+        Deduplicated data are stored in blob, javascript sets the source.
+        Data stored as external asset are referenced by relative URL.
+        """
+        if asset is not None:
+            return {"src": f"{formatter.assets_url}/{asset}"}
+
+        if formatter.blob_store is not None:
+            key = formatter.blob_store.add(mime_type, data, raw_writer)
+            return {"data_blob": key, "data_mime": mime_type}
+
+        # Spooled data are written directly to the stream in place of the marker.
+        data = formatter.payload_writer.inline(data, raw_writer)
+        return {"src": f"data:{mime_type};base64,{data}"}
+
+    @staticmethod
+    def get_compressed_source(formatter, data, encoded=None, codec="gzip"):
+        """
+        Attributes of the span holding compressed text.
+        Deduplicated data are stored in blob, referenced by the key.
+        Text compressed by encode_embed() is not compressed again.
+        Codec other than gzip is given by the codec attribute.
+        """
+        level = formatter.compression.level
+        writer = functools.partial(gzip_base64_writer, compresslevel=level, codec=codec)
+        encode = functools.partial(
+            compress_text,
+            codec=codec,
+            compression=formatter.compression,
+            cache=formatter.encode_cache,
+            timings=formatter.timings,
+        )
+        if encoded is not None:
+
+            def encode(_data):
+                return encoded
+
+        attributes = {} if codec == "gzip" else {"codec": codec}
+
+        if formatter.blob_store is not None:
+            key = formatter.blob_store.add(codec, data, writer, encode)
+            return {"data_blob": key, **attributes}
+
+        if formatter.trailing_payloads is not None:
+            key = formatter.trailing_payloads.add(data, writer, encode)
+            return {"data_payload": key, **attributes}
+
+        data = formatter.payload_writer.inline(data, writer, encode)
+        return {"data": data, **attributes}
+
     def generate_embed(self, formatter, embed_data):
         """
         Converts embed data into HTML.
@@ -889,42 +1157,10 @@ class Step:
         prevent accidental call of this.
         """
 
-        caption = embed_data.caption
-        mime_type = embed_data.mime_type
-        data = embed_data.data
-        compress = embed_data.compress
+        use_caption, _ = self.get_embed_caption(embed_data)
         filename = embed_data.filename
 
-        # If caption is user defined.
-        if caption is not None:
-            use_caption = caption
-
-        # If caption is not defined try to use default one for specific mime type.
-        elif mime_type in DEFAULT_CAPTION_FOR_MIME_TYPE:
-            use_caption = DEFAULT_CAPTION_FOR_MIME_TYPE[mime_type]
-
-        # No caption and no default caption for given mime type.
-        else:
-            use_caption = "unknown-mime-type"
-            data = "data removed"
-
-        file_path = self.get_file_path_from_data(data)
-
-        if file_path:
-            try:
-                with file_path.open("rb") as _file:
-                    data = _file.read()
-                    if "text" not in mime_type:
-                        data_base64 = base64.b64encode(data)
-                        data = data_base64.decode("utf-8").replace("\n", "")
-                    else:
-                        data = data.decode("utf-8")
-
-            except (ValueError, OSError, UnicodeDecodeError) as error:
-                # Handle various file reading errors gracefully
-                mime_type = "text"
-                error_type = type(error).__name__
-                data = f"data removed: {error_type}: '{error}'"
+        encoded = self.get_encoded(formatter, embed_data)
 
         with div(cls="messages"), div(cls="embed-capsule"):
             # Embed Caption.
@@ -932,7 +1168,9 @@ class Step:
                 use_caption,
                 cls=f"embed-button {formatter.get_collapse_cls('embed')}",
                 id=f"embed_button_{embed_data.uuid}",
-                onclick=f"toggle_hash('{embed_data.uuid}')",
+                **formatter.inline_attributes(
+                    {"onclick": f"toggle_hash('{embed_data.uuid}')"},
+                ),
             )
 
             # Embed content.
@@ -941,13 +1179,14 @@ class Step:
                 id=f"embed_{embed_data.uuid}",
             ):
                 self.generate_download_button(
+                    formatter,
                     embed_data,
-                    data,
+                    encoded.data,
                     use_caption,
                     filename,
-                    compress,
+                    compress=encoded.compress,
                 )
-                self.generate_embed_content(mime_type, data, compress)
+                self.generate_embed_content(encoded, formatter)
 
     def generate_table(self, formatter):
         """
@@ -962,7 +1201,12 @@ class Step:
         with table(cls="table"):
             # Make a heading.
             with thead(
-                onclick="toggle_hash(" f"'table_{PrettyHTMLFormatter.table_number}')",
+                **formatter.inline_attributes(
+                    {
+                        "onclick": "toggle_hash("
+                        f"'table_{PrettyHTMLFormatter.table_number}')",
+                    },
+                ),
             ):
                 line = tr()
                 for heading in table_headings:
@@ -990,8 +1234,12 @@ class Step:
         with table(cls="table"):
             if formatter.collapse_text:
                 with thead(
-                    onclick="toggle_hash("
-                    f"'table_{PrettyHTMLFormatter.table_number}')",
+                    **formatter.inline_attributes(
+                        {
+                            "onclick": "toggle_hash("
+                            f"'table_{PrettyHTMLFormatter.table_number}')",
+                        },
+                    ),
                 ):
                     line = tr()
                     line += th("Text")
@@ -1008,28 +1256,61 @@ class Step:
 
         PrettyHTMLFormatter.table_number += 1
 
-    def get_file_path_from_data(self, data):
+    @staticmethod
+    def get_embed_caption(embed_data):
         """
-        Get file path from data if applicable.
+        Get caption of the embed and whether its mime type is known.
         """
+        caption = embed_data.caption
+        mime_type = embed_data.mime_type
 
-        file_path = None
-        # Do not try to check filename for long data.
-        # Leads to OSError on some filesystems.
-        filename_len_limit = MAX_FILENAME_LENGTH
+        # If caption is user defined.
+        if caption is not None:
+            return caption, True
 
-        if isinstance(data, Path):
-            file_path = data
+        # If caption is not defined try to use default one for specific mime type.
+        if mime_type in DEFAULT_CAPTION_FOR_MIME_TYPE:
+            return DEFAULT_CAPTION_FOR_MIME_TYPE[mime_type], True
 
-        if isinstance(data, str) and (len(data) < filename_len_limit):
-            try:
-                file_path = Path(str(data))
-                if not file_path.is_file():
-                    file_path = None
-            except OSError:
-                file_path = None
+        # No caption and no default caption for given mime type.
+        return "unknown-mime-type", False
 
-        return file_path
+    @classmethod
+    def get_encode_arguments(cls, embed_data, *, resolve_path=True):
+        """
+        Get arguments of encode_embed() for the embed, file path is left
+        to encode_embed() unless resolve_path is set.
+        """
+        _, known_mime_type = cls.get_embed_caption(embed_data)
+        mime_type = embed_data.mime_type
+        data = embed_data.spooled or embed_data.data
+        if not known_mime_type:
+            data = "data removed"
+
+        file_path = cls.get_file_path_from_data(data) if resolve_path else None
+        return mime_type, data, embed_data.compress, file_path
+
+    @classmethod
+    def get_encoded(cls, formatter, embed_data):
+        """
+        Get embed data encoded by encode_embed(), in advance by the worker pool
+        if enabled. Timings of the encoding are added to the formatter.
+        """
+        encoded = embed_data.encoded
+        if encoded is None:
+            encoded = encode_embed(
+                *cls.get_encode_arguments(embed_data),
+                **formatter.get_encode_options(),
+            )
+        merge_timings(formatter.timings, encoded.timings)
+        return encoded
+
+    @staticmethod
+    def get_file_path_from_data(data):
+        """
+        Get file path from data if applicable.
+        """
+        return embed_file_path(data)
 
 
 class Embed:
@@ -1056,6 +1337,12 @@ class Embed:
         while self.uuid in Embed.uuids:
             self.uuid = str(uuid.uuid4()).replace("-", "")[:MIN_UUID_LENGTH]
         Embed.uuids.add(self.uuid)
+        self._data = None
+        self._spool = None
+        # Result of encode_embed(), or future of it, set by the formatter.
+        self._encoded = None
+        self._encoding = None
+        self._encoder = None
         self.set_data(mime_type, data, caption)
         self._fail_only = fail_only
         self._compress = compress
@@ -1067,6 +1354,10 @@ class Embed:
         Set data, mime_type and caption with validation.
         """
 
+        # Previous data are replaced, remove them from disk.
+        self.discard_spooled()
+        self._discard_encoded()
+
         # Validating mime_type.
         if not isinstance(mime_type, str) or not mime_type:
             # One option is to raise an exception - with no generated log.
@@ -1105,7 +1396,7 @@ class Embed:
         self._data = data
 
         # Validating caption.
-        if not (isinstance(caption, (str, None))):
+        if not (isinstance(caption, (str, type(None)))):
             # Let user know in their generated log an issue was detected.
             self._mime_type = "text"
             self._data = (
@@ -1115,6 +1406,59 @@ class Embed:
             return
 
         self._caption = caption
+        self._spool_data()
+        self._encode()
+
+    def set_spool(self, spool):
+        """
+        Store data bigger than spool threshold on disk instead of memory.
+        This applies also to data set later by set_data().
+        """
+        self._spool = spool
+        self._spool_data()
+
+    def _spool_data(self):
+        """
+        Move data to the spool, if they are big enough.
+        """
+        if self._spool is not None and self._spool.should_spool(self._data):
+            spooled = self._spool.store(self._data)
+            if spooled is not None:
+                self._data = spooled
+
+    def set_encoder(self, encoder):
+        """
+        Encode data in background, again after set_data() or set_compress().
+
+        :param encoder: Called with the embed, returns future of encoded data.
+        :type encoder: callable
+        """
+        self._encoder = encoder
+        if self._encoded is None and self._encoding is None:
+            self._encode()
+
+    def _encode(self):
+        """
+        Submit data to the encoder, if set.
+        """
+        if self._encoder is not None:
+            self._encoding = self._encoder(self)
+
+    def _discard_encoded(self):
+        """
+        Drop encoded data, they do not match the embed any more.
+        """
+        self._encoded = None
+        if self._encoding is not None:
+            self._encoding.cancel()
+            self._encoding = None
+
+    def discard_spooled(self):
+        """
+        Remove data stored on disk, if any.
+        """
+        if isinstance(self._data, SpooledPayload):
+            self._data.discard()
 
     def set_fail_only(self, fail_only):
         """
@@ -1132,12 +1476,16 @@ class Embed:
         """
         Set compress flag, whether the text embed should be compressed or not.
         True: always compress
-        'auto': compress if greater than 48kB
+        'auto': compress if greater than 48kB (compression_threshold)
+        and compressible
         False: never compress
+        'gzip', 'deflate' or 'deflate-raw': always compress with the codec
 
         This is ignored for non-text files.
         """
         self._compress = compress
+        self._discard_encoded()
+        self._encode()
 
     @property
     def mime_type(self):
@@ -1147,8 +1495,29 @@ class Embed:
     @property
     def data(self):
         "Read-only data access."
+        if isinstance(self._data, SpooledPayload):
+            return self._data.read()
         return self._data
 
+    @property
+    def spooled(self):
+        "Data stored on disk by the spool, None if data are in memory."
+        if isinstance(self._data, SpooledPayload):
+            return self._data
+        return None
+
+    @property
+    def encoded(self):
+        "Data encoded by the encoder, None if not encoded (or encoder failed)."
+        if self._encoding is not None:
+            try:
+                self._encoded = self._encoding.result()
+            except (BrokenExecutor, CancelledError, MemoryError, OSError):
+                # Worker died (e.g. killed when out of memory), encode in place.
+                self._encoded = None
+            self._encoding = None
+        return self._encoded
+
     @property
     def caption(self):
         "Read-only caption access."
@@ -1194,6 +1563,11 @@ class Tag:
         """
         return self._link is not None
 
+    @property
+    def link(self):
+        "Read-only link access."
+        return self._link
+
     def generate_tag(self):
         """
         Converts tag to HTML.
@@ -1227,10 +1601,14 @@ class PrettyHTMLFormatter(Formatter):
         super().__init__(stream, config)
 
         self.features = []
+        # Scenario IDs by status, tag and feature, for filtering in javascript.
+        self.scenario_index = {"scenarios": [], "status": {}, "tag": {}, "feature": {}}
 
         self.high_contrast_button = False
 
         self.suite_start_time = datetime.now()
+        # Finish time of merged suite, current time is used otherwise.
+        self.suite_finish_time = None
 
         self._closed = False
 
@@ -1260,6 +1638,13 @@ class PrettyHTMLFormatter(Formatter):
             config.userdata.get(f"{config_path}.pretty_output", "true"),
         )
 
+        # Render scenarios from string templates instead of dominate tags.
+        renderer = config.userdata.get(f"{config_path}.renderer", "dominate").lower()
+        if renderer not in RENDERERS:
+            msg = f"Value '{renderer}' is not valid renderer. Accepted values: {RENDERERS}"
+            raise ValueError(msg)
+        self.fast_renderer = FastRenderer(self) if renderer == "fast" else None
+
         self.date_format = config.userdata.get(
             f"{config_path}.date_format",
             "%d-%m-%Y %H:%M:%S",
@@ -1307,6 +1692,11 @@ class PrettyHTMLFormatter(Formatter):
         if self.global_summary != "auto":
             self.global_summary = self._str_to_bool(self.global_summary)
 
+        self._read_output_options(config, config_path)
+        self._read_embed_options(config, config_path)
+        self._read_compression_options(config, config_path)
+        self._read_diagnostics_options(config, config_path)
+
         self.additional_info = {}
 
         for key, item in config.userdata.items():
@@ -1332,6 +1722,241 @@ class PrettyHTMLFormatter(Formatter):
         collapse = getattr(self, f"collapse_{item_type}", False)
         return "collapse" if collapse else ""
 
+    def inline_attributes(self, attributes, **compact_attributes):
+        """
+        Return inline event handlers (and duplicated IDs) of the element.
+
+        Compact markup has neither, events are delegated by javascript,
+        keyed on the compact attributes if any.
+
+        :param attributes: attributes of the element in full markup
+        :type attributes: dict
+        :return: attributes of the element for the current config.
+        :rtype: dict
+        """
+        if self.compact_markup:
+            return compact_attributes
+        return attributes
+
+    def _read_output_options(self, config, config_path):
+        """
+        Read options selecting how the page is written.
+        """
+        # Write every finished feature to the stream as soon as the next one starts.
+        self.streaming = self._str_to_bool(
+            config.userdata.get(f"{config_path}.streaming", "false"),
+        )
+        self._document_end = None
+
+        # Write shard for behave-html-pretty-merge instead of the page.
+        self.shard = self._str_to_bool(
+            config.userdata.get(f"{config_path}.shard", "false"),
+        )
+        self.streaming = self.streaming or self.shard
+
+        # Write the body gzip compressed, javascript inflates it when loaded.
+        self.compress_body = not self.shard and self._str_to_bool(
+            config.userdata.get(f"{config_path}.compress_body", "false"),
+        )
+        self._body_stream = None
+
+        # Delegate event handlers instead of writing them to every element.
+        self.compact_markup = self._str_to_bool(
+            config.userdata.get(f"{config_path}.compact_markup", "false"),
+        )
+
+        # Index steps and text embeds for the search box in the global summary.
+        self.search_index = None
+        if self._str_to_bool(
+            config.userdata.get(f"{config_path}.search_index", "false"),
+        ):
+            self.search_index = SearchIndex()
+
+        # Compress scenarios of every feature, javascript inflates them on demand.
+        self.lazy_features = self._str_to_bool(
+            config.userdata.get(f"{config_path}.lazy_features", "false"),
+        )
+
+    def _read_embed_options(self, config, config_path):
+        """
+        Read options related to storing and encoding of embeds.
+        """
+        # Keep embeds bigger than threshold (in kB) in temporary files.
+        self.embed_spool = None
+        spool_threshold = int(
+            config.userdata.get(f"{config_path}.embed_spool_threshold", "0"),
+        )
+        if spool_threshold > 0:
+            self.embed_spool = EmbedSpool(
+                spool_threshold * 1024,
+                config.userdata.get(f"{config_path}.embed_spool_dir") or None,
+            )
+        self.payload_writer = PayloadWriter()
+
+        # Store identical embed payloads only once.
+        self.blob_store = None
+        if self._str_to_bool(
+            config.userdata.get(f"{config_path}.deduplicate_embeds", "false"),
+        ):
+            self.blob_store = BlobStore()
+
+        # Write compressed text embeds to scripts after the scenarios.
+        self.trailing_payloads = None
+        if self.blob_store is None and self._str_to_bool(
+            config.userdata.get(f"{config_path}.trailing_payloads", "false"),
+        ):
+            self.trailing_payloads = TrailingPayloads()
+        self._embed_stats_row = None
+
+        # Encode embeds in the worker pool before the page is generated.
+        self.encode_workers = int(
+            config.userdata.get(f"{config_path}.encode_workers", "0"),
+        )
+        # Encode every embed in background as soon as it is embedded.
+        self.eager_encoding = self._str_to_bool(
+            config.userdata.get(f"{config_path}.eager_encoding", "false"),
+        )
+        # Forking while tests run (WebDriver, logging threads) may deadlock.
+        self.encode_executor = config.userdata.get(
+            f"{config_path}.encode_executor",
+            "thread" if self.eager_encoding else "process",
+        ).lower()
+        if self.encode_executor not in ENCODE_EXECUTORS:
+            msg = (
+                f"Value '{self.encode_executor}' is not valid encode_executor. "
+                f"Accepted values: {list(ENCODE_EXECUTORS)}"
+            )
+            raise ValueError(msg)
+        self._encode_pool = None
+
+        # Write images and videos to assets directory instead of the page.
+        embed_storage = config.userdata.get(
+            f"{config_path}.embed_storage",
+            "inline",
+        ).lower()
+        if embed_storage not in EMBED_STORAGES:
+            msg = (
+                f"Value '{embed_storage}' is not valid embed_storage. "
+                f"Accepted values: {EMBED_STORAGES}"
+            )
+            raise ValueError(msg)
+        self.assets_dir = None
+        self.assets_url = None
+        if embed_storage == "external":
+            self._set_assets_dir(
+                config.userdata.get(f"{config_path}.embed_assets_dir") or None,
+            )
+
+    def _read_compression_options(self, config, config_path):
+        """
+        Read codec, level and threshold of compression of text embeds.
+        """
+        codec = config.userdata.get(f"{config_path}.compression_codec", "gzip")
+        codec = codec.lower()
+        if codec not in COMPRESSION_CODECS:
+            msg = (
+                f"Value '{codec}' is not valid compression_codec. "
+                f"Accepted values: {list(COMPRESSION_CODECS)}"
+            )
+            raise ValueError(msg)
+        level = int(config.userdata.get(f"{config_path}.compression_level", "6"))
+        if level not in COMPRESSION_LEVELS:
+            msg = f"Value '{level}' is not valid compression_level (0-9)."
+            raise ValueError(msg)
+        # Text bigger than threshold (in kB) is compressed by compress="auto".
+        threshold = int(
+            config.userdata.get(
+                f"{config_path}.compression_threshold",
+                str(EMBED_COMPRESSION_THRESHOLD // 1024),
+            ),
+        )
+        self.compression = Compression(codec, level, threshold * 1024)
+
+        # Keep compressed text embeds in the directory across runs, size in MB.
+        self.encode_cache = None
+        encode_cache_dir = config.userdata.get(f"{config_path}.encode_cache_dir")
+        if encode_cache_dir:
+            cache_size = int(
+                config.userdata.get(f"{config_path}.encode_cache_size", "1024"),
+            )
+            self.encode_cache = EncodeCache(encode_cache_dir, cache_size * 1024 * 1024)
+
+    def _set_assets_dir(self, assets_dir):
+        """
+        Set directory of external assets, '<report>_assets' next to the page
+        by default, and its URL relative to the page.
+        """
+        output = self.stream_opener.name
+        if assets_dir is None:
+            if output is None:
+                msg = "External embed storage needs output file or embed_assets_dir."
+                raise ValueError(msg)
+            output_path = Path(output)
+            assets_dir = output_path.with_name(f"{output_path.stem}_assets")
+
+        self.assets_dir = Path(assets_dir).resolve()
+        page_dir = Path(output).resolve().parent if output else Path.cwd()
+        try:
+            relative_dir = Path(os.path.relpath(self.assets_dir, page_dir))
+            self.assets_url = urllib.parse.quote(relative_dir.as_posix())
+        except ValueError:
+            # Different drive on Windows, relative path does not exist.
+            self.assets_url = self.assets_dir.as_uri()
+
+    def get_encode_options(self):
+        """
+        Keyword arguments of encode_embed() given by the configuration.
+        """
+        # Worker pool compresses text in advance, in parallel (also eagerly).
+        # Cached text is compressed in advance too, to store the result.
+        stream_threshold = None
+        if (
+            self.encode_workers <= 0
+            and not self.eager_encoding
+            and self.encode_cache is None
+        ):
+            stream_threshold = STREAM_ENCODE_THRESHOLD
+        return {
+            "timed": self.timings is not None,
+            "assets_dir": self.assets_dir,
+            "stream_threshold": stream_threshold,
+            "compression": self.compression,
+            "cache": self.encode_cache,
+            # Eagerly encoded files may be removed by the test before close().
+            "stream_files": not self.eager_encoding,
+            # Duplicated text is compressed only once, by the blob store.
+            "deduplicate": self.blob_store is not None,
+        }
+
+    def _read_diagnostics_options(self, config, config_path):
+        """
+        Read options of phase timing and profiling of the formatter.
+        """
+        # Comma separated outputs of phase timings, "none" disables timing.
+        self.diagnostics = [
+            output.strip().lower()
+            for output in config.userdata.get(
+                f"{config_path}.diagnostics",
+                "none",
+            ).split(",")
+        ]
+        if self.diagnostics == ["none"]:
+            self.diagnostics = []
+        for output in self.diagnostics:
+            if output not in DIAGNOSTICS:
+                msg = (
+                    f"Value '{output}' is not valid diagnostics. "
+                    f"Accepted values: {['none', *DIAGNOSTICS]}"
+                )
+                raise ValueError(msg)
+        self.timings = {} if self.diagnostics else None
+        self.diagnostics_file = (
+            config.userdata.get(f"{config_path}.diagnostics_file") or None
+        )
+
+        # Profile close() with cProfile, statistics are written to the file.
+        self.profile_file = config.userdata.get(f"{config_path}.profile_file") or None
+
     def _str_to_bool(self, value):
         """
         Convert string configuration value to boolean.
@@ -1347,10 +1972,13 @@ class PrettyHTMLFormatter(Formatter):
 
         return value_lower in ["true", "yes", "1"]
 
+    @timed("callback.feature")
     def feature(self, feature):
         current_feature = self.current_feature
         if current_feature:
             current_feature.finish_time = datetime.now()
+            if self.streaming:
+                self._write_feature(current_feature)
 
         self.feature_counter += 1
         self.scenario_counter = 0
@@ -1393,6 +2021,7 @@ class PrettyHTMLFormatter(Formatter):
         # Call this on Feature, to be consistent with before_scenario_finish.
         self.current_feature.after_scenario_finish(status)
 
+    @timed("callback.scenario")
     def scenario(self, scenario):
         """
         Processes new scenario. It is added to the current feature.
@@ -1432,6 +2061,7 @@ class PrettyHTMLFormatter(Formatter):
         # Not used, parsed in scenario().
         # self.current_scenario.add_step(step.keyword, step.name, step.text, step.table)
 
+    @timed("callback.match")
     def match(self, match):
         """
         Step is matched and will be executed next.
@@ -1442,6 +2072,7 @@ class PrettyHTMLFormatter(Formatter):
         if match.location:
             self.current_scenario.add_match(match)
 
+    @timed("callback.result")
     def result(self, step):
         """
         Step execution is finished.
@@ -1458,6 +2089,7 @@ class PrettyHTMLFormatter(Formatter):
         URI.
         """
 
+    @timed("callback.background")
     def background(self, background):
         """
         Background call.
@@ -1482,6 +2114,7 @@ class PrettyHTMLFormatter(Formatter):
 
         span(the_rest)
 
+    @timed("callback.embed")
     def embed(
         self,
         mime_type,
@@ -1506,6 +2139,10 @@ class PrettyHTMLFormatter(Formatter):
             filename=filename,
             compress=compress,
         )
+        if self.embed_spool is not None:
+            embed_data.set_spool(self.embed_spool)
+        if self.eager_encoding:
+            embed_data.set_encoder(self._submit_encode)
         # Find correct scenario.
         self.current_feature.embed(embed_data)
         return embed_data
@@ -1556,7 +2193,14 @@ class PrettyHTMLFormatter(Formatter):
         Calculate Statuses of either Feature or Scenario behave object.
         """
 
-        status = behave_object.status.name.lower()
+        self._count_status(behave_object.status, statuses)
+
+    def _count_status(self, status, statuses):
+        """
+        Add single Status to the status counters.
+        """
+
+        status = status.name.lower()
 
         # Handle upstream Status.error status, add it to Status.failed for now.
         if status == "error":
@@ -1589,24 +2233,32 @@ class PrettyHTMLFormatter(Formatter):
 
         return global_status
 
-    def _generate_global_summary(self):
+    def _show_global_summary(self):
         """
-        Process and render global statistics.
+        Decide if global summary is generated.
+        In streaming mode the feature count is not known in advance,
+        so "auto" always generates it.
         """
 
         if self.global_summary == "auto":
-            if len(self.features) <= 1:
-                return False
+            return self.streaming or len(self.features) > 1
+
+        return self.global_summary
 
-        elif not self.global_summary:
+    def _generate_global_summary(self):
+        """
+        Process and render global statistics.
+        """
+
+        if not self._show_global_summary():
             return False
 
         feature_statuses, scenario_statuses = {}, {}
         for feature in self.features:
             self._calculate_statuses(feature, feature_statuses)
 
-            for scenario in feature.scenarios:
-                self._calculate_statuses(scenario, scenario_statuses)
+            for status in feature.scenario_statuses:
+                self._count_status(status, scenario_statuses)
 
         global_status = self._calculate_global_status_from_results(feature_statuses)
 
@@ -1690,8 +2342,24 @@ class PrettyHTMLFormatter(Formatter):
                             cls=f"global-summary-status {status.name.lower()}",
                         )
 
+                # Tags are filled in by javascript from the scenario index.
+                div("Tags: ", cls="feature-summary-row tag-filter")
+
+                if self.search_index is not None:
+                    with div("Search: ", cls="feature-summary-row"):
+                        input_(
+                            type="search",
+                            id="search-input",
+                            onchange="search_report(this.value)",
+                        )
+                        div(id="search-results")
+
+                # Embed counts are known after features are generated.
+                if self.blob_store is not None:
+                    self._embed_stats_row = div(cls="feature-summary-row")
+
             with div(cls="feature-summary-stats flex-left-space"):
-                finish_time = datetime.now()
+                finish_time = self.suite_finish_time or datetime.now()
                 suite_duration = finish_time - self.suite_start_time
                 div(
                     f"Started: {self.suite_start_time.strftime(self.date_format)}",
@@ -1708,6 +2376,89 @@ class PrettyHTMLFormatter(Formatter):
 
         return True
 
+    def _fill_embed_stats(self):
+        """
+        Show deduplication statistics in the global summary.
+        """
+        if self._embed_stats_row is None:
+            return
+
+        references = self.blob_store.references
+        unique = self.blob_store.unique
+        ratio = references / unique if unique else 1.0
+        self._embed_stats_row.add(
+            f"Embeds: {references}, unique: {unique}, "
+            f"deduplication ratio: {ratio:.2f}",
+        )
+
+    def _generate_scenario_index(self):
+        """
+        Generate index of scenario IDs, javascript filters scenarios by it.
+        """
+        index = json.dumps(self.scenario_index, separators=(",", ":"))
+        return script(
+            # Tags can contain anything, do not let them close the script.
+            raw(index.replace("</", "<\\/")),
+            type="application/json",
+            id="scenario-index",
+        )
+
+    def _generate_search_index(self):
+        """
+        Generate gzip compressed search index, decoded by javascript on search.
+        """
+        index = self.search_index.to_json()
+        return script(
+            raw(
+                self.payload_writer.register_compressed(
+                    index,
+                    self.compression.level,
+                ),
+            ),
+            type="application/octet-stream",
+            id="search-index",
+        )
+
+    def _generate_blobs(self):
+        """
+        Generate shared section with payloads not written yet.
+        """
+        return self._generate_payload_scripts(
+            "embed-blobs",
+            "blob",
+            self.blob_store.pop_pending(),
+        )
+
+    def _generate_trailing_payloads(self):
+        """
+        Generate section with payloads of compressed text embeds not written yet.
+        """
+        return self._generate_payload_scripts(
+            "embed-payloads",
+            "p",
+            self.trailing_payloads.pop_pending(),
+        )
+
+    def _generate_payload_scripts(self, cls, prefix, pending):
+        """
+        Generate section with script for every (key, content) pair.
+        """
+        with div(cls=cls) as payloads:
+            for key, content in pending:
+                # Spooled data are written directly to the stream.
+                text = (
+                    self.payload_writer.register(content)
+                    if callable(content)
+                    else content
+                )
+                script(
+                    raw(text),
+                    type="application/octet-stream",
+                    id=f"{prefix}-{key}",
+                )
+
+        return payloads
+
     def _add_unexecuted_scenario(self):
         class DummyStep:  # pylint: disable=too-few-public-methods
             """
@@ -1765,15 +2516,66 @@ class PrettyHTMLFormatter(Formatter):
             scenario.status = Status.failed
             step = scenario.current_step
             step.status = Status.failed
+
+        # Interpreter is shutting down, pool can not schedule new futures.
+        self.encode_workers = 0
+        self.eager_encoding = False
         self.close()
 
+    def _generate_diagnostics(self):
+        """
+        Generate collapsed block with phase timings of the formatter.
+        Timings are filled in when the page is written, to include rendering.
+        """
+        with details(cls="formatter-diagnostics") as diagnostics_block:
+            summary("Formatter diagnostics")
+            raw(self.payload_writer.register(self._write_timings_table))
+
+        return diagnostics_block
+
+    def _write_timings_table(self, write):
+        """
+        Write table of phase timings measured so far.
+        """
+        with table(cls="table") as timings_table:
+            with thead(), tr():
+                th("Phase")
+                th("Calls")
+                th("Time")
+            with tbody():
+                for phase, timing in timings_report(self.timings).items():
+                    with tr():
+                        td(phase)
+                        td(timing["calls"])
+                        td(f"{timing['time']:.3f}s")
+
+        write(timings_table.render(pretty=False))
+
+    def _write_diagnostics_file(self):
+        """
+        Write phase timings as JSON next to the output file.
+        """
+        diagnostics_file = self.diagnostics_file
+        if diagnostics_file is None:
+            output = self.stream_opener.name or "html-pretty"
+            diagnostics_file = f"{output}.diagnostics.json"
+
+        diagnostics = {
+            "features": len(self.features),
+            "streaming": self.streaming,
+            "encode_workers": self.encode_workers,
+            "phases": timings_report(self.timings),
+        }
+        with Path(diagnostics_file).open("w", encoding="utf-8") as _file:
+            json.dump(diagnostics, _file, indent=2)
+
     def _generate_return_button(self):
         """
         Generate return button to return to the top.
         """
 
         # Needs to be under dummy div or it won't respect contrast, strange.
-        with div(cls="return-to-the-top-dummy-div"):
+        with div(cls="return-to-the-top-dummy-div") as return_div:
             span(
                 "Return to the Top",
                 cls="return-button",
@@ -1781,23 +2583,12 @@ class PrettyHTMLFormatter(Formatter):
                 onclick="return_to_the_top()",
             )
 
-    def close(self):
+        return return_div
+
+    def _generate_head(self, document):
         """
-        Generates the entire html page with dominate.
+        Generate the head of the html page.
         """
-        if self._closed:
-            return
-        self._closed = True
-
-        # Set finish time of the last feature.
-        current_feature = self.current_feature
-        if current_feature:
-            current_feature.finish_time = datetime.now()
-
-        # Create dominate document.
-        document = dominate.document(title=self.title_string)
-
-        # Generate the head of the html page.
         with document.head:
             # Respect encoding inherited from behave.
             behave_encoding = self.stream_opener.encoding
@@ -1828,19 +2619,269 @@ class PrettyHTMLFormatter(Formatter):
             for elem in self._additional_headers:
                 raw(elem)
 
+    def _write_document_start(self):
+        """
+        Write the page up to the opening body tag (streaming or compressed mode).
+        The rest of the document is kept and written in close().
+        Compressed body is written to the payload script, until it is closed.
+        """
+        if self.shard:
+            self.stream.write(shard_line("header", dump_header(self)))
+            self._document_end = ""
+            return
+
+        document = dominate.document(title=self.title_string)
+        self._generate_head(document)
+        # Compressed body is inflated first, javascript calls onload then.
+        if not self.compress_body:
+            document.body.attributes["onload"] = "body_onload();"
+
+        rendered = document.render(pretty=self.pretty_output)
+        document_start, document_end = rendered.rsplit("</body>", 1)
+        self.stream.write(document_start)
+        self._document_end = "</body>" + document_end
+        if self.pretty_output:
+            self._document_end = "\n" + self._document_end
+
+        if self.compress_body:
+            self.stream.write(
+                '<script type="application/octet-stream" id="compressed-body">',
+            )
+            self._body_stream = GzipBase64Stream(
+                self.stream.write,
+                self.compression.level,
+            )
+
+    def _write_document_end(self):
+        """
+        Write the rest of the page, compressed body is finished first.
+        """
+        if self._body_stream is not None:
+            self._body_stream.close()
+            self._body_stream = None
+            self.stream.write("</script>")
+        self.stream.write(self._document_end)
+        self.stream.flush()
+
+    def _write_element(self, element):
+        """
+        Render detached dominate element directly to the stream (streaming mode),
+        or to the compressed body (compressed mode).
+        """
+        with measure(self.timings, "render"):
+            rendered = element.render(pretty=self.pretty_output)
+        if self.pretty_output:
+            rendered = "\n" + rendered
+        write = self.stream.write
+        if self._body_stream is not None:
+            write = self._body_stream.write
+        with measure(self.timings, "write"):
+            self.payload_writer.write(rendered, write)
+            self.stream.flush()
+
+    def _encode_embeds(self, features):
+        """
+        Encode embeds of the features in the worker pool, if enabled.
+        Embeds encoded already (eagerly) are not submitted again.
+        Results are stored in the embeds, so the page is generated in order.
+        """
+        if self.encode_workers <= 0:
+            return
+
+        for feature in features:
+            for embed_data in feature.iter_embeds():
+                embed_data.set_encoder(self._submit_encode)
+
+    def _submit_encode(self, embed_data):
+        """
+        Submit embed to the worker pool, return future of encode_embed() result.
+        """
+        if self._encode_pool is None:
+            executor = ENCODE_EXECUTORS[self.encode_executor]
+            self._encode_pool = executor(max_workers=max(self.encode_workers, 1))
+
+        # Files are checked in the worker too, stat is slow on network storage.
+        arguments = Step.get_encode_arguments(embed_data, resolve_path=False)
+        try:
+            return self._encode_pool.submit(
+                encode_embed,
+                *arguments,
+                resolve_path=True,
+                **self.get_encode_options(),
+            )
+        except RuntimeError:
+            # Pool is shut down or broken, embed is encoded in place.
+            return None
+
+    def _write_feature(self, feature):
+        """
+        Write finished feature to the stream and drop its data (streaming mode).
+        """
+        if self._document_end is None:
+            self._write_document_start()
+
+        if self.shard:
+            self.stream.write(shard_line("feature", dump_feature(feature)))
+            self.stream.flush()
+            feature.release()
+            return
+
+        # Toggle buttons are in the global summary, unless it is disabled.
+        if feature is self.features[0] and not self._show_global_summary():
+            feature.icon = self.icon
+            feature.high_contrast_button = True
+
+        self._encode_embeds([feature])
+        with measure(self.timings, "dom"):
+            feature_element = feature.generate_feature(self)
+        self._write_element(feature_element)
+        # Write blobs before release, spooled data are removed on release.
+        if self.blob_store is not None:
+            self._write_element(self._generate_blobs())
+        if self.trailing_payloads is not None:
+            self._write_element(self._generate_trailing_payloads())
+        feature.release()
+
+    def _close_streaming(self):
+        """
+        Write the last feature and the rest of the page (streaming mode).
+        The global summary is written last, javascript moves it to the top.
+        """
+        current_feature = self.current_feature
+        if current_feature:
+            self._write_feature(current_feature)
+
+        self._finish_streaming()
+
+    def _finish_streaming(self):
+        """
+        Write the rest of the page, once all features are written (streaming mode).
+        """
+        if self._document_end is None:
+            self._write_document_start()
+
+        if self.shard:
+            self.suite_finish_time = datetime.now()
+            self.stream.write(shard_line("footer", dump_footer(self)))
+        else:
+            with div(cls="global-summary-trailing") as trailing_summary:
+                generated = self._generate_global_summary()
+            self._fill_embed_stats()
+            if generated:
+                self._write_element(trailing_summary)
+
+            self._write_element(self._generate_scenario_index())
+            if self.search_index is not None:
+                self._write_element(self._generate_search_index())
+
+            if "html" in self.diagnostics:
+                self._write_element(self._generate_diagnostics())
+
+            self._write_element(self._generate_return_button())
+
+        self._write_document_end()
+        self._cleanup()
+
+    def close(self):
+        """
+        Generates the entire html page with dominate.
+        """
+        if self._closed:
+            return
+        self._closed = True
+
+        profiler = None
+        if self.profile_file:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        with measure(self.timings, "close"):
+            self._generate_page()
+
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(self.profile_file)
+
+        if "json" in self.diagnostics:
+            self._write_diagnostics_file()
+
+    def _generate_page(self):
+        """
+        Generate the page and write it to the stream, finish it in streaming mode.
+        In compressed mode, body elements are written to the compressed body.
+        """
+        # Set finish time of the last feature.
+        current_feature = self.current_feature
+        if current_feature:
+            current_feature.finish_time = datetime.now()
+
+        # Features were written already, only finish the page.
+        if self.streaming:
+            self._close_streaming()
+            return
+
+        # Create dominate document.
+        document = dominate.document(title=self.title_string)
+
+        # Generate the head of the html page.
+        self._generate_head(document)
+
         # Iterate over the data and generate the page.
-        with document.body as body:
+        with measure(self.timings, "dom"), document.body as body:
             body.attributes["onload"] = "body_onload();"
             if not self._generate_global_summary():
                 if self.features:
                     feature = self.features[0]
                     feature.icon = self.icon
                     feature.high_contrast_button = True
+            self._encode_embeds(self.features)
             for feature in self.features:
                 feature.generate_feature(self)
 
+            self._generate_scenario_index()
+            if self.search_index is not None:
+                self._generate_search_index()
+
+            if self.blob_store is not None:
+                self._generate_blobs()
+                self._fill_embed_stats()
+
+            if self.trailing_payloads is not None:
+                self._generate_trailing_payloads()
+
+            if "html" in self.diagnostics:
+                self._generate_diagnostics()
+
             # At the end of the document, generate return button.
             self._generate_return_button()
 
+        if self.compress_body:
+            self._write_document_start()
+            for element in document.body.children:
+                self._write_element(element)
+            self._write_document_end()
+            self._cleanup()
+            return
+
+        with measure(self.timings, "render"):
+            rendered = document.render(pretty=self.pretty_output)
+
         # Write everything to the stream which correlates to the -o <file> behave option.
-        self.stream.write(document.render(pretty=self.pretty_output))
+        with measure(self.timings, "write"):
+            self.payload_writer.write(rendered, self.stream.write)
+        self._cleanup()
+
+    def _cleanup(self):
+        """
+        Remove temporary files after the page was written,
+        evict least recently used files from the encode cache.
+        """
+        if self.embed_spool is not None:
+            self.embed_spool.cleanup()
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown()
+            self._encode_pool = None
+        if self.encode_cache is not None:
+            self.encode_cache.evict()
+        # Files may change before the next run (in the same process).
+        is_embed_file.cache_clear()
@@ -0,0 +1,251 @@
+"""
+Merge shards written by parallel behave workers into a single report.
+
+Shards are read one feature at a time, features are renumbered and written
+to the report right away, so the number of shards is not limited by memory.
+"""
+
+# pylint: disable=protected-access
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from behave.configuration import Configuration
+from behave.formatter.base import StreamOpener
+from behave.model_core import Status
+
+from .html_pretty import Embed, Feature, PrettyHTMLFormatter, Scenario, Tag
+from .shard import SHARD_VERSION, read_shard, read_shard_footer, read_shard_header
+
+CONFIG_PATH = f"behave.formatter.{PrettyHTMLFormatter.name}"
+
+
+def load_feature(data, counter):
+    """
+    Create feature with all its scenarios from the shard.
+    """
+    behave_feature = SimpleNamespace(
+        name=data["name"],
+        description=data["description"].split("\n") if data["description"] else [],
+        location=data["location"],
+        tags=data["tags"],
+    )
+    feature = Feature(behave_feature, counter)
+    feature.status = Status.from_name(data["status"])
+    feature.start_time = datetime.fromtimestamp(data["start_time"])
+    feature.finish_time = datetime.fromtimestamp(data["finish_time"])
+    feature.scenarios = [
+        load_scenario(scenario_data, feature) for scenario_data in data["scenarios"]
+    ]
+    return feature
+
+
+def load_scenario(data, feature):
+    """
+    Create scenario with all its (pseudo) steps from the shard.
+    """
+    steps = data["steps"]
+    behave_steps = steps[1:-1] if data["pseudo_steps"] else steps
+    behave_scenario = SimpleNamespace(
+        name=data["name"],
+        description=data["description"],
+        location=data["location"],
+        tags=[],
+        status=Status.from_name(data["status"]),
+        steps=[
+            SimpleNamespace(
+                keyword=step_data["keyword"],
+                name=step_data["name"],
+                text=step_data["text"],
+                table=load_table(step_data["table"]),
+            )
+            for step_data in behave_steps
+        ],
+        error_message=None,
+        exception=None,
+    )
+    scenario = Scenario(
+        behave_scenario,
+        feature,
+        data["counter"],
+        data["pseudo_steps"],
+    )
+    scenario.status = behave_scenario.status
+    scenario.duration = data["duration"]
+    scenario.tags = [Tag(tag, link) for tag, link in data["tags"]]
+    for step, step_data in zip(scenario.all_steps, steps):
+        load_step(step, step_data)
+    return scenario
+
+
+def load_table(data):
+    """
+    Create table of the step from the shard.
+    """
+    if data is None:
+        return None
+    return SimpleNamespace(headings=data["headings"], rows=data["rows"])
+
+
+def load_step(step, data):
+    """
+    Restore result and embeds of the step from the shard.
+    """
+    step.status = Status.from_name(data["status"])
+    step.duration = data["duration"]
+    step.location = data["location"]
+    step.location_link = data["location_link"]
+    step.commentary_override = data["commentary"]
+    step.margin_top = data["margin_top"]
+    step.embeds = [load_embed(embed_data) for embed_data in data["embeds"]]
+
+
+def load_embed(data):
+    """
+    Create embed from the shard, with new unique uuid.
+    """
+    return Embed(
+        data["mime_type"],
+        data["data"],
+        data["caption"],
+        data["fail_only"],
+        download_button=data["download_button"],
+        filename=data["filename"],
+        compress=data["compress"],
+    )
+
+
+def merge_shards(paths, stream, defines=(), filename=None):
+    """
+    Merge shards into a single report written to the stream.
+
+    :param paths: Shard files, features are written in this order.
+    :type paths: list
+
+    :param defines: Formatter options in 'name=value' format, as behave -D.
+    :type defines: list
+
+    :param filename: Name of the report file, if the stream writes to a file.
+    :type filename: str
+    """
+    command_args = []
+    for define in defines:
+        command_args.extend(["-D", define])
+    config = Configuration(command_args=command_args)
+    # Features are written as soon as they are read from the shards.
+    config.userdata[f"{CONFIG_PATH}.streaming"] = "true"
+    config.userdata[f"{CONFIG_PATH}.shard"] = "false"
+    formatter = PrettyHTMLFormatter(
+        StreamOpener(filename=filename, stream=stream),
+        config,
+    )
+
+    # Versions are checked before anything is written, headers are first lines.
+    start_times = _read_start_times(paths)
+    if start_times:
+        formatter.suite_start_time = datetime.fromtimestamp(min(start_times))
+
+    # Page settings are needed before features are written, footer is the last
+    # line, plain shards are read from the end (gzip shards are read twice).
+    for path in paths:
+        footer = read_shard_footer(path)
+        if footer is not None:
+            _apply_footer(formatter, config, footer)
+            break
+
+    # Finish time is needed only by the global summary at the end of the page.
+    counter = 0
+    finish_times = []
+    for path in paths:
+        for kind, data in read_shard(path, {"feature", "footer"}):
+            if kind == "footer":
+                finish_times.append(data["finish_time"])
+                continue
+            counter += 1
+            feature = load_feature(data, counter)
+            formatter.features.append(feature)
+            formatter._write_feature(feature)
+
+    if finish_times:
+        formatter.suite_finish_time = datetime.fromtimestamp(max(finish_times))
+    formatter._closed = True
+    formatter._finish_streaming()
+
+
+def _read_start_times(paths):
+    """
+    Check versions of the shards and return their start times.
+    """
+    start_times = []
+    for path in paths:
+        header = read_shard_header(path)
+        if header is None:
+            continue
+        if header["version"] > SHARD_VERSION:
+            msg = (
+                f"Shard '{path}' has version {header['version']}, "
+                f"supported version is {SHARD_VERSION}."
+            )
+            raise ValueError(msg)
+        start_times.append(header["start_time"])
+    return start_times
+
+
+def _apply_footer(formatter, config, footer):
+    """
+    Use page settings of the workers, unless defined for the merge.
+    """
+    if f"{CONFIG_PATH}.title_string" not in config.userdata:
+        formatter.set_title(footer["title"])
+    if footer["icon"]:
+        formatter.set_icon(footer["icon"])
+    for html_elem in footer["head_elements"]:
+        formatter.add_html_head_element(html_elem)
+    formatter.additional_info = {
+        **footer["additional_info"],
+        **formatter.additional_info,
+    }
+
+
+def main(argv=None):
+    """
+    Entry point of behave-html-pretty-merge.
+    """
+    parser = argparse.ArgumentParser(
+        prog="behave-html-pretty-merge",
+        description="Merge shards of parallel behave runs into a single report.",
+    )
+    parser.add_argument(
+        "shards",
+        nargs="+",
+        metavar="SHARD",
+        help="Shard written with behave.formatter.html-pretty.shard=true.",
+    )
+    parser.add_argument(
+        "-o",
+        "--outfile",
+        help="Write the report to the file instead of stdout.",
+    )
+    parser.add_argument(
+        "-D",
+        "--define",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Formatter option, same as behave -D.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.outfile:
+        with Path(args.outfile).open("w", encoding="utf-8") as stream:
+            merge_shards(args.shards, stream, args.define, args.outfile)
+    else:
+        merge_shards(args.shards, sys.stdout, args.define)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,990 @@
+"""
+Embed payload helpers for PrettyHTMLFormatter.
+
+Big payloads are not kept in memory, rendered page contains only a marker,
+which is replaced by the payload when the page is written to the stream.
+"""
+
+import base64
+import contextlib
+import functools
+import hashlib
+import html
+import os
+import re
+import shutil
+import tempfile
+import uuid
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+import markdown
+
+from .timing import measure
+
+# Multiple of 3, so that base64 encoded chunks can be simply concatenated.
+CHUNK_SIZE = 3 * 256 * 1024  # 768KB
+EMBED_COMPRESSION_THRESHOLD = 48 * 1024  # 48KB
+# Compression formats of the browser DecompressionStream, to zlib wbits.
+COMPRESSION_CODECS = {"gzip": 16 + 15, "deflate": 15, "deflate-raw": -15}
+COMPRESSION_LEVELS = range(10)
+# Text sampled by compress="auto", compressed only if the samples shrink enough
+# (including base64 encoding of the compressed data).
+COMPRESSIBILITY_SAMPLE_SIZE = 16 * 1024
+COMPRESSIBILITY_RATIO = 0.9
+# Bigger compressed text is not shown, only downloaded (compressed anyway).
+MAX_INLINE_TEXT_SIZE = 1024 * 1024  # 1MB
+# Bigger text is compressed in chunks straight to the stream, when written.
+STREAM_ENCODE_THRESHOLD = CHUNK_SIZE
+# Longer data are not checked as file names, leads to OSError on some filesystems.
+MAX_FILENAME_LENGTH = 256
+# Cached stats of embedded files, the same files are often embedded by many steps.
+FILE_STAT_CACHE_SIZE = 4096
+# Length of content hash used as a blob reference.
+BLOB_KEY_LENGTH = 20
+# File name suffixes of embeds stored as external assets.
+ASSET_SUFFIXES = {"image/png": ".png", "video/webm": ".webm"}
+# Private use characters, never escaped by dominate.
+MARKER_START = "\ue000"
+MARKER_END = "\ue001"
+
+
+# Embed data prepared for rendering by encode_embed().
+EncodedEmbed = namedtuple(
+    "EncodedEmbed",
+    [
+        "mime_type",
+        "data",
+        "content",
+        "compress",
+        "encoded",
+        "error",
+        "timings",
+        "asset",
+    ],
+)
+
+# Compression of text embeds given by the configuration.
+Compression = namedtuple("Compression", ["codec", "level", "threshold"])
+DEFAULT_COMPRESSION = Compression("gzip", 6, EMBED_COMPRESSION_THRESHOLD)
+
+
+class SpooledPayload:
+    """
+    Embed data stored in a temporary file.
+    """
+
+    def __init__(self, path, size, lines):
+        self.path = path
+        self.size = size
+        self.lines = lines
+
+    def read(self):
+        """
+        Load whole data back to memory.
+        """
+        return self.path.read_text(encoding="utf-8")
+
+    def iter_text(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over data as text chunks.
+        """
+        with self.path.open("r", encoding="utf-8", newline="") as _file:
+            while True:
+                chunk = _file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_bytes(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over data as utf-8 encoded chunks.
+        """
+        with self.path.open("rb") as _file:
+            while True:
+                chunk = _file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def discard(self):
+        """
+        Remove the temporary file.
+        """
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+
+
+class TextPayload(SpooledPayload):
+    """
+    Big text kept in memory, written in chunks the same way as spooled data,
+    so that it is not encoded as a whole before it is written.
+    """
+
+    def __init__(self, text):  # pylint: disable=super-init-not-called
+        self.path = None
+        self.size = len(text)
+        self.text = text
+
+    @property
+    def lines(self):
+        """
+        Number of new lines, counted only when needed.
+        """
+        return self.text.count("\n")
+
+    def read(self):
+        """
+        Return the text.
+        """
+        return self.text
+
+    def iter_text(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over text chunks.
+        """
+        for position in range(0, len(self.text), chunk_size):
+            yield self.text[position : position + chunk_size]
+
+    def iter_bytes(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over text chunks encoded to utf-8.
+        """
+        for chunk in self.iter_text(chunk_size):
+            yield chunk.encode("utf-8")
+
+    def discard(self):
+        """
+        Nothing to remove, text is released with the payload.
+        """
+
+
+class FilePayload(SpooledPayload):
+    """
+    Binary file embedded by path, read in chunks and base64 encoded when
+    written, so that the whole file is never in memory.
+    """
+
+    def __init__(self, path):  # pylint: disable=super-init-not-called
+        self.path = path
+        # Length of base64 encoded data.
+        self.size = (path.stat().st_size + 2) // 3 * 4
+        self.lines = 0
+
+    def read(self):
+        """
+        Load whole base64 encoded data to memory.
+        """
+        return "".join(self.iter_text())
+
+    def iter_text(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over base64 encoded chunks of the file.
+
+        :param chunk_size: Bytes of the file, multiple of 3.
+        """
+        for chunk in self.iter_bytes(chunk_size):
+            yield chunk.decode("ascii")
+
+    def iter_bytes(self, chunk_size=CHUNK_SIZE):
+        """
+        Iterate over base64 encoded chunks of the file, as bytes.
+
+        :param chunk_size: Bytes of the file, multiple of 3.
+        """
+        for chunk in iter_file_chunks(self.path, chunk_size):
+            yield base64.b64encode(chunk)
+
+    def discard(self):
+        """
+        Nothing to remove, embedded file belongs to the user.
+        """
+
+
+class EmbedSpool:
+    """
+    Stores embed data bigger than threshold in temporary files.
+    """
+
+    def __init__(self, threshold, directory=None):
+        self.threshold = threshold
+        self.directory = directory
+        self._spool_dir = None
+        self._counter = 0
+
+    def should_spool(self, data):
+        """
+        Check if data are big enough to be stored on disk.
+        """
+        return isinstance(data, str) and len(data) > self.threshold
+
+    def store(self, data):
+        """
+        Write data to temporary file and return handle to it,
+        None if the data can not be stored.
+        """
+        if self._spool_dir is None:
+            self._spool_dir = Path(
+                tempfile.mkdtemp(prefix="behave-html-pretty-", dir=self.directory),
+            )
+        self._counter += 1
+        path = self._spool_dir / f"embed-{self._counter}"
+        try:
+            with path.open("w", encoding="utf-8", newline="") as _file:
+                _file.write(data)
+        except (UnicodeEncodeError, OSError):
+            # Kept in memory, encoding error is reported in the page.
+            with contextlib.suppress(OSError):
+                path.unlink()
+            return None
+        return SpooledPayload(path, len(data), data.count("\n"))
+
+    def cleanup(self):
+        """
+        Remove all temporary files.
+        """
+        if self._spool_dir is not None:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+            self._spool_dir = None
+
+
+class PayloadWriter:
+    """
+    Replaces payload markers in rendered page by the payload itself.
+    """
+
+    def __init__(self):
+        self._marker_start = f"{MARKER_START}{uuid.uuid4().hex[:8]}:"
+        self._pattern = re.compile(
+            re.escape(self._marker_start) + r"(\d+)" + MARKER_END,
+        )
+        self._writers = {}
+        self._counter = 0
+
+    def register(self, writer):
+        """
+        Register function writing the payload, return marker to be rendered.
+
+        :param writer: Called with stream write function when marker is written.
+        :type writer: callable
+        """
+        self._counter += 1
+        self._writers[str(self._counter)] = writer
+        return f"{self._marker_start}{self._counter}{MARKER_END}"
+
+    def register_compressed(self, rendered, compresslevel=6):
+        """
+        Register rendered markup to be written gzip compressed and base64 encoded,
+        payloads of markers in the markup are written to the compressed data.
+        """
+
+        def _write(write):
+            stream = GzipBase64Stream(write, compresslevel)
+            self.write(rendered, stream.write)
+            stream.close()
+
+        return self.register(_write)
+
+    def inline(self, data, writer_factory, encode=None):
+        """
+        Return in-memory data (encoded if requested), marker for spooled data.
+
+        :param writer_factory: Creates writer for the spooled data.
+        :type writer_factory: callable
+
+        :param encode: Applied to in-memory data.
+        :type encode: callable
+        """
+        if isinstance(data, SpooledPayload):
+            return self.register(writer_factory(data))
+        if encode is not None:
+            return encode(data)
+        return data
+
+    def write(self, rendered, write):
+        """
+        Write rendered page, payloads are written in place of markers.
+        """
+        if not self._writers:
+            write(rendered)
+            return
+
+        position = 0
+        for match in self._pattern.finditer(rendered):
+            write(rendered[position : match.start()])
+            self._writers.pop(match.group(1))(write)
+            position = match.end()
+        write(rendered[position:])
+
+
+class GzipBase64Stream:
+    """
+    Compresses written data with gzip (or other codec of COMPRESSION_CODECS),
+    writes them encoded to base64.
+    """
+
+    def __init__(self, write, compresslevel=6, codec="gzip"):
+        self._write = write
+        # wbits 16 + 15 produces gzip container, same as gzip.compress().
+        self._compressor = zlib.compressobj(
+            compresslevel,
+            zlib.DEFLATED,
+            COMPRESSION_CODECS[codec],
+        )
+        self._pending = b""
+
+    def write(self, data):
+        """
+        Compress text or bytes, write whole base64 encoded 3 byte groups.
+        Long data are compressed in chunks, never copied as a whole.
+        """
+        if isinstance(data, str):
+            for position in range(0, len(data), CHUNK_SIZE):
+                chunk = data[position : position + CHUNK_SIZE]
+                self._write_chunk(chunk.encode("utf-8"))
+            return
+        with memoryview(data) as view:
+            for position in range(0, len(view), CHUNK_SIZE):
+                self._write_chunk(view[position : position + CHUNK_SIZE])
+
+    def _write_chunk(self, chunk):
+        """
+        Compress the chunk, write whole 3 byte groups of compressed data.
+        """
+        self._pending += self._compressor.compress(chunk)
+        aligned = len(self._pending) - len(self._pending) % 3
+        if aligned:
+            with memoryview(self._pending) as pending:
+                self._write(base64.b64encode(pending[:aligned]).decode("ascii"))
+            self._pending = self._pending[aligned:]
+
+    def close(self):
+        """
+        Write the rest of compressed data.
+        """
+        self._pending += self._compressor.flush()
+        self._write(base64.b64encode(self._pending).decode("ascii"))
+        self._pending = b""
+
+
+class BlobStore:
+    """
+    Keeps every unique payload once, embeds reference it by content hash.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._written = set()
+        self.references = 0
+
+    def add(self, kind, data, writer_factory, encode=None):
+        """
+        Add payload, return key of the blob holding it.
+        Duplicated payloads are not encoded again.
+
+        :param kind: Encoding or mime type, part of the key.
+        :type kind: str
+
+        :param writer_factory: Creates writer for the spooled data.
+        :type writer_factory: callable
+
+        :param encode: Applied to new in-memory data.
+        :type encode: callable
+        """
+        self.references += 1
+        key = content_hash(kind, data)
+        if key in self._pending or key in self._written:
+            return key
+
+        self._pending[key] = payload_content(data, writer_factory, encode)
+        return key
+
+    @property
+    def unique(self):
+        """
+        Number of unique payloads.
+        """
+        return len(self._pending) + len(self._written)
+
+    def pop_pending(self):
+        """
+        Return blobs not written yet, as (key, content) pairs.
+        Content is either string or a writer of the spooled data.
+        """
+        pending = list(self._pending.items())
+        self._written.update(self._pending)
+        self._pending = {}
+        return pending
+
+
+class TrailingPayloads:
+    """
+    Keeps payloads written after the scenarios, embeds reference them by key,
+    so that big payloads are not held in attributes of the elements.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._counter = 0
+
+    def add(self, data, writer_factory, encode=None):
+        """
+        Add payload, return key of the script holding it.
+
+        :param writer_factory: Creates writer for the spooled data.
+        :type writer_factory: callable
+
+        :param encode: Applied to in-memory data.
+        :type encode: callable
+        """
+        self._counter += 1
+        key = str(self._counter)
+        self._pending.append((key, payload_content(data, writer_factory, encode)))
+        return key
+
+    def pop_pending(self):
+        """
+        Return payloads not written yet, as (key, content) pairs.
+        Content is either string or a writer of the spooled data.
+        """
+        pending = self._pending
+        self._pending = []
+        return pending
+
+
+class EncodeCache:
+    """
+    Keeps compressed text embeds in the directory across runs, keyed by hash
+    of the text and codec settings. Least recently used files are evicted,
+    when the cache is bigger than the limit.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    @staticmethod
+    def key(data, codec, compresslevel):
+        """
+        Key of the compressed text.
+        """
+        return content_hash(f"{codec}-{compresslevel}", data)
+
+    def get(self, key):
+        """
+        Return cached base64 encoded data, None if not cached.
+        """
+        path = self.directory / f"{key}.b64"
+        try:
+            encoded = path.read_text(encoding="ascii").strip()
+            # Modification time is the time of the last use.
+            os.utime(path)
+        except OSError:
+            return None
+        return encoded
+
+    def put(self, key, encoded):
+        """
+        Store base64 encoded data, errors are ignored, the cache is optional.
+        """
+        # Unique temporary name, other workers and runs may write the same key.
+        temporary_path = self.directory / f".{uuid.uuid4().hex}.part"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temporary_path.write_text(encoded, encoding="ascii")
+            temporary_path.replace(self.directory / f"{key}.b64")
+        except OSError:
+            with contextlib.suppress(OSError):
+                temporary_path.unlink()
+
+    def evict(self):
+        """
+        Remove least recently used files over the size limit.
+        """
+        with contextlib.suppress(OSError):
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".b64"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                with contextlib.suppress(OSError):
+                    Path(path).unlink()
+                total_size -= size
+
+
+def payload_content(data, writer_factory, encode=None):
+    """
+    Content of the payload script, writer for spooled data.
+    """
+    if isinstance(data, SpooledPayload):
+        return writer_factory(data)
+    if encode is not None:
+        return encode(data)
+    return data
+
+
+def content_hash(kind, data):
+    """
+    Hash of in-memory or spooled data.
+    """
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    digest.update(b"\0")
+    if isinstance(data, SpooledPayload):
+        for chunk in data.iter_bytes():
+            digest.update(chunk)
+    else:
+        for position in range(0, len(data), CHUNK_SIZE):
+            digest.update(data[position : position + CHUNK_SIZE].encode("utf-8"))
+    return digest.hexdigest()[:BLOB_KEY_LENGTH]
+
+
+def asset_suffix(mime_type):
+    """
+    File name suffix of the asset, None if the mime type is kept inline.
+    """
+    for asset_mime_type, suffix in ASSET_SUFFIXES.items():
+        if asset_mime_type in mime_type:
+            return suffix
+    return None
+
+
+def iter_file_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over binary file in chunks, read into a single reused buffer.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with file_path.open("rb") as _file:
+        while True:
+            size = _file.readinto(buffer)
+            if not size:
+                return
+            yield view[:size]
+
+
+def iter_base64_chunks(data):
+    """
+    Decode in-memory or spooled base64 text in chunks.
+    """
+    if isinstance(data, SpooledPayload):
+        chunks = data.iter_text()
+    else:
+        chunks = (
+            data[position : position + CHUNK_SIZE]
+            for position in range(0, len(data), CHUNK_SIZE)
+        )
+
+    rest = ""
+    for chunk in chunks:
+        # Whitespace is ignored, decode whole 4 character groups only.
+        text = rest + "".join(chunk.split())
+        end = len(text) - len(text) % 4
+        rest = text[end:]
+        yield base64.b64decode(text[:end])
+    if rest:
+        yield base64.b64decode(rest + "=" * (-len(rest) % 4))
+
+
+def write_asset(directory, suffix, chunks):
+    """
+    Write asset to the directory, named by hash of its content.
+    Identical assets are stored in the same file.
+
+    :return: File name of the asset.
+    :rtype: str
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    # Unique temporary name, other workers may write the same asset.
+    temporary_path = directory / f".{uuid.uuid4().hex}{suffix}.part"
+    try:
+        with temporary_path.open("xb") as _file:
+            for chunk in chunks:
+                digest.update(chunk)
+                _file.write(chunk)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            temporary_path.unlink()
+        raise
+
+    name = f"{digest.hexdigest()[:BLOB_KEY_LENGTH]}{suffix}"
+    temporary_path.replace(directory / name)
+    return name
+
+
+@functools.lru_cache(maxsize=FILE_STAT_CACHE_SIZE)
+def is_embed_file(path):
+    """
+    Check that the path is a file, cached for the run, stat is slow
+    on network storage. The formatter clears the cache when it is closed.
+    """
+    try:
+        return Path(path).is_file()
+    except OSError:
+        return False
+
+
+def embed_file_path(data):
+    """
+    Get file path from data if applicable.
+    """
+    if isinstance(data, Path):
+        return data
+    if (
+        isinstance(data, str)
+        and len(data) < MAX_FILENAME_LENGTH
+        and is_embed_file(data)
+    ):
+        return Path(data)
+    return None
+
+
+def read_embed_file(mime_type, file_path, stream_files=True):
+    """
+    Read embedded file, binary data are base64 encoded.
+    Big binary files are read in chunks when the page is written,
+    if stream_files is set.
+
+    :return: Mime type ('text' if the file can not be read) and data.
+    :rtype: tuple
+    """
+    try:
+        with file_path.open("rb") as _file:
+            # Opened anyway, so that unreadable file is reported right away.
+            if stream_files and "text" not in mime_type:
+                payload = FilePayload(file_path)
+                if payload.size > STREAM_ENCODE_THRESHOLD:
+                    return mime_type, payload
+            data = _file.read()
+            if "text" not in mime_type:
+                data_base64 = base64.b64encode(data)
+                data = data_base64.decode("utf-8").replace("\n", "")
+            else:
+                data = data.decode("utf-8")
+
+    except (ValueError, OSError, UnicodeDecodeError) as error:
+        # Handle various file reading errors gracefully
+        mime_type = "text"
+        error_type = type(error).__name__
+        data = f"data removed: {error_type}: '{error}'"
+
+    return mime_type, data
+
+
+def encode_embed(
+    mime_type,
+    data,
+    compress,
+    file_path=None,
+    *,
+    timed=False,
+    assets_dir=None,
+    stream_threshold=None,
+    resolve_path=False,
+    compression=DEFAULT_COMPRESSION,
+    cache=None,
+    stream_files=True,
+    deduplicate=False,
+):
+    """
+    Read the file, convert markdown and compress text of the embed.
+
+    This is the expensive part of the embed rendering, it has no side effects,
+    so that it can run in a worker thread or process.
+
+    :param compress: True, False, 'auto' or codec, resolved in the result
+        to codec of the compressed text, False if not compressed.
+
+    :param file_path: Data are read from the file, if set.
+    :type file_path: Path
+
+    :param timed: Measure phases of the encoding, returned in the result.
+
+    :param assets_dir: Images and videos are written to this directory, if set.
+    :type assets_dir: Path
+
+    :param stream_threshold: Bigger text is compressed when the page is written,
+        straight to the stream, if set.
+    :type stream_threshold: int
+
+    :param resolve_path: Data are checked for file path, if set, so that
+        stat of the file runs in the worker too.
+
+    :param compression: Codec, level and 'auto' threshold of the compression.
+    :type compression: Compression
+
+    :param cache: Compressed text is reused from the cache, if set.
+    :type cache: EncodeCache
+
+    :param stream_files: Big binary files are read when the page is written,
+        if set, otherwise they are read right away.
+
+    :param deduplicate: Text is compressed once per unique blob by the blob
+        store, not here, if set.
+
+    :return: Data (read from the file), content to render, compression codec,
+        base64 encoded compressed content, encoding error, timings
+        and file name of the asset, if any.
+    :rtype: EncodedEmbed
+    """
+    timings = {} if timed else None
+    file_path = embed_file_path(data) if resolve_path else file_path
+    suffix = asset_suffix(mime_type) if assets_dir else None
+    if suffix is not None:
+        # Embedded inline, if the data can not be stored as the asset.
+        with contextlib.suppress(ValueError, OSError), measure(timings, "asset"):
+            if file_path:
+                chunks = iter_file_chunks(file_path)
+            else:
+                chunks = iter_base64_chunks(data)
+            asset = write_asset(assets_dir, suffix, chunks)
+            return EncodedEmbed(
+                mime_type=mime_type,
+                data=None,
+                content=None,
+                compress=False,
+                encoded=None,
+                error=None,
+                timings=timings,
+                asset=asset,
+            )
+
+    if file_path:
+        with measure(timings, "embed_file"):
+            mime_type, data = read_embed_file(mime_type, file_path, stream_files)
+
+    content = data
+    encoded = None
+    error = None
+    if "text" in mime_type:
+        if "markdown" in mime_type:
+            # Markdown conversion needs the whole text, even if spooled.
+            with measure(timings, "markdown"):
+                content = markdown.markdown(payload_text(data))
+
+        # Javascript will decompress data and render them, if small enough.
+        compress = compression_codec(compress, content, compression)
+
+        if compress and is_streamed(content, stream_threshold):
+            content = TextPayload(content)
+
+        # Spooled data are compressed when the page is written.
+        if compress and not isinstance(content, SpooledPayload):
+            encoded, error = encode_text(
+                content,
+                compress,
+                compression,
+                cache=cache,
+                timings=timings,
+                deduplicate=deduplicate,
+            )
+
+    return EncodedEmbed(
+        mime_type,
+        data,
+        content,
+        compress,
+        encoded,
+        error,
+        timings,
+        None,
+    )
+
+
+def encode_text(content, codec, compression, **options):
+    """
+    Compress in-memory text, unless it is left to the blob store.
+
+    :return: Base64 encoded compressed text (None if left to the blob store)
+        and encoding error, if any.
+    :rtype: tuple
+    """
+    try:
+        if options.get("deduplicate"):
+            # Only checked, the blob store fails on text which can not be encoded.
+            check_encodable(content)
+            return None, None
+        encoded = compress_text(
+            content,
+            codec,
+            compression,
+            options.get("cache"),
+            options.get("timings"),
+        )
+    except (UnicodeEncodeError, MemoryError) as encode_error:
+        return None, encode_error
+    return encoded, None
+
+
+def compress_text(content, codec, compression, cache=None, timings=None):
+    """
+    Compress in-memory text, reuse the result from the cache, if available.
+    """
+    if cache is None:
+        return gzip_base64(content, compression.level, timings, codec=codec)
+    key = cache.key(content, codec, compression.level)
+    with measure(timings, "encode_cache"):
+        encoded = cache.get(key)
+    if encoded is None:
+        encoded = gzip_base64(content, compression.level, timings, codec=codec)
+        cache.put(key, encoded)
+    return encoded
+
+
+def compression_codec(compress, content, compression=DEFAULT_COMPRESSION):
+    """
+    Resolve compress flag of the text to codec, False if not compressed.
+    With 'auto', text bigger than the threshold is compressed, if compressible.
+    Text too big to be shown is compressed always, to be downloaded instead.
+    """
+    if compress == "auto":
+        size = payload_size(content)
+        if size <= compression.threshold:
+            return False
+        if size < MAX_INLINE_TEXT_SIZE and not is_compressible(content):
+            return False
+        return compression.codec
+    if compress in COMPRESSION_CODECS:
+        return compress
+    return compression.codec if compress else False
+
+
+def is_compressible(data):
+    """
+    Check if samples of the text are reduced by a fast compression enough,
+    so that compressed text is worth decompressing by javascript.
+    """
+    sample = compression_sample(data)
+    if not sample:
+        return False
+    # Compressed text is written base64 encoded, 4 characters per 3 bytes.
+    encoded_size = len(zlib.compress(sample, 1)) * 4 / 3
+    return encoded_size < len(sample) * COMPRESSIBILITY_RATIO
+
+
+def compression_sample(data):
+    """
+    Samples from the start, middle and end of in-memory text (the whole text,
+    if the samples would overlap), spooled data are sampled from the start only.
+    """
+    size = COMPRESSIBILITY_SAMPLE_SIZE
+    if isinstance(data, SpooledPayload):
+        with contextlib.closing(data.iter_bytes(size)) as chunks:
+            return next(chunks, b"")
+    sample = data
+    if len(data) > 3 * size:
+        middle = (len(data) - size) // 2
+        sample = data[:size] + data[middle : middle + size] + data[-size:]
+    return sample.encode("utf-8", "surrogatepass")
+
+
+def is_streamed(content, stream_threshold):
+    """
+    Check if in-memory text is big enough to be compressed straight to the stream.
+    Text which can not be encoded is compressed right away to report the error.
+    """
+    if stream_threshold is None or not isinstance(content, str):
+        return False
+    if len(content) <= stream_threshold:
+        return False
+    try:
+        check_encodable(content)
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def check_encodable(content):
+    """
+    Raise UnicodeEncodeError if in-memory text can not be encoded to utf-8.
+    """
+    # Encoded chunk by chunk, the whole text is never copied.
+    for _chunk in TextPayload(content).iter_bytes():
+        pass
+
+
+def payload_size(data):
+    """
+    Length of in-memory or spooled data.
+    """
+    if isinstance(data, SpooledPayload):
+        return data.size
+    return len(data)
+
+
+def payload_lines(data):
+    """
+    Number of new lines in in-memory or spooled data.
+    """
+    if isinstance(data, SpooledPayload):
+        return data.lines
+    return data.count("\n")
+
+
+def payload_text(data):
+    """
+    In-memory data, spooled data are loaded back to memory.
+    """
+    if isinstance(data, SpooledPayload):
+        return data.read()
+    return data
+
+
+def gzip_base64(data, compresslevel=6, timings=None, codec="gzip"):
+    """
+    Compress text with gzip (or other codec) and encode it to base64.
+    """
+    # compresslevel 0 - fastest, lowest compression
+    # compresslevel 9 - slowest, biggest compression
+    # Balance compression/speed with 6
+    # Compressed and encoded in chunks, base64 is measured as part of gzip.
+    parts = []
+    with measure(timings, "gzip"):
+        stream = GzipBase64Stream(parts.append, compresslevel, codec)
+        stream.write(data)
+        stream.close()
+    return "".join(parts)
+
+
+def raw_writer(payload):
+    """
+    Writer copying spooled data as they are.
+    """
+
+    def _write(write):
+        for chunk in payload.iter_text():
+            write(chunk)
+
+    return _write
+
+
+def escaped_writer(payload):
+    """
+    Writer copying spooled data escaped for HTML text.
+    """
+
+    def _write(write):
+        for chunk in payload.iter_text():
+            write(html.escape(chunk, quote=False))
+
+    return _write
+
+
+def gzip_base64_writer(payload, compresslevel=6, codec="gzip"):
+    """
+    Writer compressing spooled data with gzip (or other codec)
+    and encoding them to base64.
+    """
+
+    def _write(write):
+        stream = GzipBase64Stream(write, compresslevel, codec)
+        for chunk in payload.iter_bytes():
+            stream.write(chunk)
+        stream.close()
+
+    return _write
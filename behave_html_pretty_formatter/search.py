@@ -0,0 +1,84 @@
+"""
+Full-text search index of PrettyHTMLFormatter, enabled by search_index option.
+
+Index is an inverted index of lowercase tokens, written to the page gzip
+compressed as JSON:
+
+names
+    Feature and scenario names, in order of scenarios in the scenario index.
+targets
+    Matched places, [scenario] for step names, [scenario, uuid, caption]
+    for embeds, where scenario is position in the scenario index.
+tokens
+    Token to positions in targets.
+
+Step names, error messages and text embeds kept in memory are indexed,
+spooled embeds are too big to be indexed.
+"""
+
+import json
+import re
+
+from behave.model_core import Status
+
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+# Longer tokens are mostly hashes and encoded data, not worth searching for.
+MAX_TOKEN_LENGTH = 40
+
+
+def tokenize(text):
+    """
+    Unique lowercase tokens of the text.
+    """
+    return {
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) <= MAX_TOKEN_LENGTH
+    }
+
+
+class SearchIndex:
+    """
+    Maps tokens of step names and embeds to scenarios and embeds.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.targets = []
+        self.tokens = {}
+
+    def add(self, target, text):
+        """
+        Add tokens of the text pointing to the target.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        position = len(self.targets)
+        self.targets.append(target)
+        for token in tokens:
+            self.tokens.setdefault(token, []).append(position)
+
+    def add_scenario(self, position, scenario):
+        """
+        Add scenario at the position in the scenario index.
+        """
+        self.names.append(f"{scenario.feature.name}: {scenario.name}")
+        steps = " ".join(f"{step.keyword} {step.name}" for step in scenario.steps)
+        self.add([position], f"{scenario.name} {steps}")
+        for step in scenario.all_steps:
+            for embed_data in step.embeds:
+                # Same condition as in Step.generate_step().
+                if embed_data.fail_only and scenario.status != Status.failed:
+                    continue
+                if "text" not in embed_data.mime_type or embed_data.spooled:
+                    continue
+                target = [position, embed_data.uuid, embed_data.caption or ""]
+                self.add(target, embed_data.data)
+
+    def to_json(self):
+        """
+        Compact JSON of the index.
+        """
+        index = {"names": self.names, "targets": self.targets, "tokens": self.tokens}
+        return json.dumps(index, separators=(",", ":"))
@@ -0,0 +1,224 @@
+"""
+Shard, intermediate output of PrettyHTMLFormatter.
+
+Parallel behave workers write shards instead of HTML pages,
+behave-html-pretty-merge merges them into a single report.
+
+Shard is a JSON lines file (optionally gzip compressed), every line is
+an object with "type" key:
+
+header
+    Written first, "version" of the format and suite "start_time".
+feature
+    One line per finished feature, with its scenarios, steps and embeds.
+footer
+    Written last, suite "finish_time", "title", "icon", "head_elements"
+    and "additional_info" of the formatter.
+
+Times are POSIX timestamps. Embedded files are read when the shard is
+written, so the shard does not depend on files of the worker.
+"""
+
+# pylint: disable=protected-access
+
+import contextlib
+import gzip
+import json
+import os
+from pathlib import Path
+
+from .payload import payload_text, read_embed_file
+
+SHARD_VERSION = 1
+# Plain shards are read from the end in blocks, when looking for the footer.
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def shard_line(kind, data):
+    """
+    Serialize shard line, compact JSON with "type" key first.
+    """
+    line = {"type": kind}
+    line.update(data)
+    return json.dumps(line, separators=(",", ":")) + "\n"
+
+
+def line_type(line):
+    """
+    Type of the shard line, without parsing the whole line.
+    """
+    prefix = '{"type":"'
+    if not line.startswith(prefix):
+        return None
+    return line[len(prefix) : line.index('"', len(prefix))]
+
+
+def dump_header(formatter):
+    """
+    Shard header.
+    """
+    return {
+        "version": SHARD_VERSION,
+        "start_time": formatter.suite_start_time.timestamp(),
+    }
+
+
+def dump_footer(formatter):
+    """
+    Shard footer, settings of the formatter may change during the run.
+    """
+    return {
+        "finish_time": formatter.suite_finish_time.timestamp(),
+        "title": formatter.title_string,
+        "icon": formatter.icon,
+        "head_elements": list(formatter._additional_headers),
+        "additional_info": formatter.additional_info,
+    }
+
+
+def dump_feature(feature):
+    """
+    Serialize feature with all its scenarios.
+    """
+    return {
+        "name": feature.name,
+        "description": feature.description,
+        "location": str(feature.location),
+        "status": feature.status.name,
+        "tags": [str(tag) for tag in feature.tags],
+        "start_time": feature.start_time.timestamp(),
+        "finish_time": feature.finish_time.timestamp(),
+        "scenarios": [dump_scenario(scenario) for scenario in feature.scenarios],
+    }
+
+
+def dump_scenario(scenario):
+    """
+    Serialize scenario with all its (pseudo) steps.
+    """
+    # Check for after_scenario errors, as when the scenario is generated.
+    scenario.report_error(scenario._scenario)
+
+    return {
+        "name": scenario.name,
+        "description": list(scenario._scenario.description),
+        "location": str(scenario.location),
+        "counter": scenario.counter,
+        "status": scenario.status.name,
+        "duration": scenario.duration,
+        "tags": [[str(tag.behave_tag), tag.link] for tag in scenario.tags],
+        "pseudo_steps": bool(scenario.pseudo_steps),
+        "steps": [dump_step(step) for step in scenario.all_steps],
+    }
+
+
+def dump_step(step):
+    """
+    Serialize step with its embeds.
+    """
+    step_table = None
+    if step.table:
+        step_table = {
+            "headings": list(step.table.headings),
+            "rows": [list(row) for row in step.table.rows],
+        }
+
+    return {
+        "keyword": step.keyword,
+        "name": step.name,
+        "text": step.text,
+        "table": step_table,
+        "status": step.status.name,
+        "duration": step.duration,
+        "location": step.location,
+        "location_link": step.location_link,
+        "commentary": step.commentary_override,
+        "margin_top": step.margin_top,
+        "embeds": [dump_embed(step, embed_data) for embed_data in step.embeds],
+    }
+
+
+def dump_embed(step, embed_data):
+    """
+    Serialize embed, embedded file is read.
+    """
+    mime_type, data, _, file_path = step.get_encode_arguments(embed_data)
+    if file_path:
+        mime_type, data = read_embed_file(mime_type, file_path)
+
+    return {
+        "mime_type": mime_type,
+        "data": payload_text(data),
+        "caption": embed_data.caption,
+        "fail_only": embed_data.fail_only,
+        "download_button": embed_data.download_button,
+        "filename": embed_data.filename,
+        "compress": embed_data.compress,
+    }
+
+
+def open_shard(path):
+    """
+    Open shard for reading, gzip compressed shards end with '.gz'.
+    """
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return Path(path).open(encoding="utf-8")
+
+
+def read_shard(path, kinds=None):
+    """
+    Iterate over (type, data) of shard lines, one line in memory at a time.
+
+    :param kinds: Parse only lines of these types, skip the rest.
+    :type kinds: set
+    """
+    with open_shard(path) as shard:
+        for line in shard:
+            if not line.strip():
+                continue
+            if kinds is not None and line_type(line) not in kinds:
+                continue
+            data = json.loads(line)
+            yield data.pop("type"), data
+
+
+def read_shard_header(path):
+    """
+    Header of the shard, only the first line is read.
+    """
+    with contextlib.closing(read_shard(path)) as lines:
+        for kind, data in lines:
+            return data if kind == "header" else None
+    return None
+
+
+def read_shard_footer(path):
+    """
+    Footer of the shard, None if the shard is not finished.
+
+    Plain shards are read from the end, gzip compressed shards have to be
+    decompressed whole.
+    """
+    if str(path).endswith(".gz"):
+        footer = None
+        for _, data in read_shard(path, {"footer"}):
+            footer = data
+        return footer
+
+    with Path(path).open("rb") as shard:
+        position = shard.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            block_size = min(TAIL_BLOCK_SIZE, position)
+            position -= block_size
+            shard.seek(position)
+            tail = shard.read(block_size) + tail
+            if b"\n" in tail.rstrip():
+                break
+    line = tail.rstrip().rsplit(b"\n", 1)[-1].decode("utf-8")
+    if line_type(line) != "footer":
+        return None
+    data = json.loads(line)
+    data.pop("type")
+    return data
@@ -0,0 +1,94 @@
+"""
+Phase timing of PrettyHTMLFormatter, enabled by diagnostics option.
+
+Timings are kept in a dict of phase name to [calls, seconds], so that
+timings measured in worker processes can be returned and merged.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+
+# Phases in order of the report, nested phases are included in outer ones,
+# e.g. "dom" includes encoding of embeds not encoded by the worker pool.
+PHASES = [
+    "callback.feature",
+    "callback.scenario",
+    "callback.background",
+    "callback.match",
+    "callback.result",
+    "callback.embed",
+    "embed_file",
+    "asset",
+    "markdown",
+    "gzip",
+    "dom",
+    "render",
+    "write",
+    "close",
+]
+
+
+def add_timing(timings, phase, seconds, calls=1):
+    """
+    Add duration of the phase to timings.
+    """
+    record = timings.setdefault(phase, [0, 0.0])
+    record[0] += calls
+    record[1] += seconds
+
+
+def merge_timings(timings, other):
+    """
+    Add timings measured elsewhere (e.g. in worker process) to timings.
+    """
+    if timings is None or not other:
+        return
+    for phase, (calls, seconds) in other.items():
+        add_timing(timings, phase, seconds, calls)
+
+
+@contextmanager
+def measure(timings, phase):
+    """
+    Measure duration of the block, if timings are enabled (not None).
+    """
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(timings, phase, time.perf_counter() - start)
+
+
+def timed(phase):
+    """
+    Decorator measuring formatter method, if timings of the formatter are enabled.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.timings is None:
+                return method(self, *args, **kwargs)
+            with measure(self.timings, phase):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timings_report(timings):
+    """
+    Timings as JSON serializable dict, phases in order of the report.
+    """
+    phases = [phase for phase in PHASES if phase in timings]
+    phases += sorted(phase for phase in timings if phase not in PHASES)
+    return {
+        phase: {"calls": timings[phase][0], "time": round(timings[phase][1], 6)}
+        for phase in phases
+    }
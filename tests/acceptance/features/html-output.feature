@@ -56,3 +56,779 @@ Feature: Make behave generate Pretty HTML as output
       </body>
       </html>
       """
+
+  Scenario: Run behave with Pretty HTML Formatter in streaming mode
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/first.feature" with
+      """
+      Feature: First
+        Scenario: One
+          Given a step passes
+      """
+    And a file named "features/second.feature" with
+      """
+      Feature: Second
+        Scenario: Two
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -D behave.formatter.html-pretty.streaming=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <section class="feature-filter-container untested" id="f2">
+      """
+    And the command output should contain
+      """
+      <div class="global-summary-trailing">
+      """
+    And the command output should contain
+      """
+      </body>
+      </html>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter spooling big embeds
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("big logs are embedded")
+      def step_embed_logs(context):
+          formatter = context._runner.formatters[0]
+          log = "spooled log line\n" * 200
+          formatter.embed("text", log, caption="Log", compress=False)
+          broken = "\ud800" * 2000
+          formatter.embed("text", broken, caption="Broken", compress=True)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given big logs are embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.embed_spool_threshold=1"
+    Then it should pass
+    And the command output should contain
+      """
+      spooled log line
+      spooled log line
+      """
+    And the command output should contain
+      """
+      Data encoding error: 'utf-8' codec can't encode character
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter deduplicating embeds
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a log is embedded")
+      def step_embed_log(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "same log", caption="Log", compress=True)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a log is embedded
+          And a log is embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.deduplicate_embeds=true -D behave.formatter.html-pretty.global_summary=true"
+    Then it should pass
+    And the command output should contain
+      """
+      Embeds: 2, unique: 1, deduplication ratio: 2.00
+      """
+    And the command output should contain
+      """
+      <div class="embed-blobs">
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter encoding embeds in worker pool
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a markdown is embedded")
+      def step_embed_markdown(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text/markdown", "# Title", caption="Notes", compress=False)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a markdown is embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.encode_workers=2"
+    Then it should pass
+    And the command output should contain
+      """
+      <h1>Title</h1>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter encoding embeds in worker pool on exit
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      import sys
+
+      from behave import step
+
+      @step("a markdown is embedded and behave exits")
+      def step_embed_markdown_exit(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text/markdown", "# Title", caption="Notes", compress=False)
+          sys.exit(1)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a markdown is embedded and behave exits
+      """
+    And a file named "check_report.py" with
+      """
+      from pathlib import Path
+
+      report = Path("report.html").read_text(encoding="utf-8")
+      print(f"report written: {'<h1>Title</h1>' in report}")
+      """
+    When I run "behave --format html-pretty -o report.html -D behave.formatter.html-pretty.encode_workers=2"
+    Then it should fail
+    When I run "python check_report.py"
+    Then the command output should contain
+      """
+      report written: True
+      """
+    When I run "behave --format html-pretty -o report.html -D behave.formatter.html-pretty.encode_workers=2 -D behave.formatter.html-pretty.encode_executor=thread"
+    Then it should fail
+    When I run "python check_report.py"
+    Then the command output should contain
+      """
+      report written: True
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter using fast renderer
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step('a log "{name}" is embedded')
+      def step_embed_log(context, name):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "<log> & more", caption=name, compress=False)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a log "Log" is embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.renderer=fast"
+    Then it should pass
+    And the command output should contain
+      """
+      <span>a log </span><b>&quot;Log&quot;</b><span> is embedded</span>
+      """
+    And the command output should contain
+      """
+      <span mime="text">&lt;log&gt; &amp; more</span>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter encoding embeds eagerly
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a markdown is embedded and replaced")
+      def step_embed_markdown(context):
+          formatter = context._runner.formatters[0]
+          embed_data = formatter.embed("text/markdown", "# Old", "Notes", compress=False)
+          embed_data.set_data("text/markdown", "# New", "Notes")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a markdown is embedded and replaced
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.eager_encoding=true -D behave.formatter.html-pretty.encode_executor=thread"
+    Then it should pass
+    And the command output should contain
+      """
+      <h1>New</h1>
+      """
+    And the command output should not contain
+      """
+      <h1>Old</h1>
+      """
+
+  Scenario: Merge shards of parallel behave runs into a single report
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/first.feature" with
+      """
+      Feature: First
+        Scenario: One
+          Given a step passes
+      """
+    And a file named "features/second.feature" with
+      """
+      Feature: Second
+        Scenario: Two
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -o first.jsonl -D behave.formatter.html-pretty.shard=true features/first.feature"
+    And I run "behave --format html-pretty --dry-run -o second.jsonl -D behave.formatter.html-pretty.shard=true features/second.feature"
+    And I run "python -m behave_html_pretty_formatter.merge first.jsonl second.jsonl"
+    Then it should pass
+    And the command output should contain
+      """
+      <section class="feature-filter-container untested" id="f2">
+      """
+    And the command output should contain
+      """
+      <span>Feature: Second</span>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter recording formatter diagnostics
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      Feature: Passing
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.diagnostics=json,html -D behave.formatter.html-pretty.diagnostics_file=diagnostics.json -D behave.formatter.html-pretty.profile_file=report.prof"
+    Then it should pass
+    And the command output should contain
+      """
+      <summary>Formatter diagnostics</summary>
+      """
+    And a file named "report.prof" should exist
+    When I run "python -m json.tool diagnostics.json"
+    Then it should pass
+    And the command output should contain
+      """
+      "callback.result": {
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter storing embeds as external assets
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a screenshot is embedded")
+      def step_embed_screenshot(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("image/png", "bm90IHJlYWxseSBhIFBORw==", caption="Screenshot")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a screenshot is embedded
+          And a screenshot is embedded
+      """
+    When I run "behave --format html-pretty -o report.html -D behave.formatter.html-pretty.embed_storage=external"
+    Then it should pass
+    And a file named "report_assets/9d243875ccf8e0cf70d7.png" should exist
+    And the file "report.html" should not contain "data:image/png;base64"
+
+  Scenario: Run behave with Pretty HTML Formatter compressing the body
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      Feature: Passing
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -D behave.formatter.html-pretty.compress_body=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <script type="application/octet-stream" id="compressed-body">
+      """
+    And the command output should not contain
+      """
+      <span>Feature: Passing</span>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter compressing scenarios of lazy features
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      Feature: Passing
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -D behave.formatter.html-pretty.lazy_features=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <span>Feature: Passing</span>
+      """
+    And the command output should contain
+      """
+      <script class="feature-payload" type="application/octet-stream">
+      """
+    And the command output should not contain
+      """
+      onclick="expand_this_only(this)">Scenario: One</div>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter writing scenario index
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      @smoke
+      Feature: Passing
+        @fast
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run"
+    Then it should pass
+    And the command output should contain
+      """
+      <script id="scenario-index" type="application/json">{"scenarios":["f1-s1"],"status":{"untested":[0]},"tag":{"smoke":[0],"fast":[0]},"feature":{"f1":[0,1]}}</script>
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter writing search index
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      Feature: Passing
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -D behave.formatter.html-pretty.search_index=true -D behave.formatter.html-pretty.global_summary=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <input id="search-input" onchange="search_report(this.value)" type="search">
+      """
+    And the command output should contain
+      """
+      <script id="search-index" type="application/octet-stream">
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter writing compact markup
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/use_behave4cmd0_steps.py" with
+      """
+      from behave4cmd0 import passing_steps
+      """
+    And a file named "features/passing.feature" with
+      """
+      Feature: Passing
+        Scenario: One
+          Given a step passes
+      """
+    When I run "behave --format html-pretty --dry-run -D behave.formatter.html-pretty.compact_markup=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <div class="scenario-name">Scenario: One</div>
+      """
+    And the command output should contain
+      """
+      <span class="button" data-toggle="summary-f1">Summary</span>
+      """
+    And the command output should contain
+      """
+      <div class="feature-summary-stats feature-buttons"></div>
+      """
+    And the command output should not contain
+      """
+      onclick="expand_this_only(this)"
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter writing trailing payloads
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a log is embedded")
+      def step_embed_log(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "some log", caption="Log", compress=True)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a log is embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.trailing_payloads=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <span class="to-render" compressed="true" data-payload="1" mime="text" show="true">
+      """
+    And the command output should contain
+      """
+      <div class="embed-payloads">
+      """
+    And the command output should contain
+      """
+      <script id="p-1" type="application/octet-stream">
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter compressing big text in chunks
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("a big log is embedded")
+      def step_embed_log(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "big log line\n" * 80000, caption="Log")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a big log is embedded
+      """
+    And a file named "decode_report.py" with
+      """
+      import base64
+      import gzip
+      import re
+      from pathlib import Path
+
+      report = Path("report.html").read_text(encoding="utf-8")
+      for data in re.findall(r'compressed="true" data="([^"]+)"', report):
+          text = gzip.decompress(base64.b64decode(data)).decode("utf-8")
+          print(f"decoded {len(text)} characters, {text.count('big log line')} lines")
+      """
+    When I run "behave --format html-pretty -o report.html"
+    Then it should pass
+    When I run "python decode_report.py"
+    Then it should pass
+    And the command output should contain
+      """
+      decoded 1040000 characters, 80000 lines
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter embedding big file in chunks
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from pathlib import Path
+
+      from behave import step
+
+      @step("a big video is embedded")
+      def step_embed_video(context):
+          video = Path("video.webm")
+          video.write_bytes(b"\0" * 3 * 1024 * 1024)
+          formatter = context._runner.formatters[0]
+          formatter.embed("video/webm", video, caption="Video")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a big video is embedded
+      """
+    When I run "behave --format html-pretty"
+    Then it should pass
+    And the command output should contain
+      """
+      <source src="data:video/webm;base64,AAAAAAAA
+      """
+    And the command output should not contain
+      """
+      data removed
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter embedding big file removed by the test
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from pathlib import Path
+
+      from behave import step
+
+      @step("a big video is embedded and removed")
+      def step_embed_video(context):
+          video = Path("video.webm")
+          video.write_bytes(b"\0" * 3 * 1024 * 1024)
+          formatter = context._runner.formatters[0]
+          embed = formatter.embed("video/webm", video, caption="Video")
+          if context.config.userdata.get("wait_for_encoding"):
+              # Eager encoding finished before the test removed the file.
+              assert embed.encoded is not None
+          video.unlink()
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given a big video is embedded and removed
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.eager_encoding=true -D wait_for_encoding=true"
+    Then it should pass
+    And the command output should contain
+      """
+      <source src="data:video/webm;base64,AAAAAAAA
+      """
+    When I run "behave --format html-pretty"
+    Then it should pass
+    And the command output should contain
+      """
+      data removed: FileNotFoundError
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter compressing embeds with deflate
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("logs are embedded")
+      def step_embed_logs(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "some log", caption="Log", compress=True)
+          formatter.embed("text", "raw log", caption="Raw", compress="deflate-raw")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given logs are embedded
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.compression_codec=deflate"
+    Then it should pass
+    And the command output should contain
+      """
+      <span class="to-render" codec="deflate" compressed="true" data="eJwrzs9NVcjJTwcADjkDFw==" mime="text" show="true">
+      """
+    And the command output should contain
+      """
+      <span class="to-render" codec="deflate-raw" compressed="true" data="K0osV8jJTwcA" mime="text" show="true">
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter compressing only compressible text
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      import random
+
+      from behave import step
+
+      @step("logs are embedded")
+      def step_embed_logs(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "log line\n" * 10000, caption="Log")
+          rng = random.Random(1)
+          noise = "".join(chr(rng.randrange(0x4E00, 0x9FFF)) for _ in range(60000))
+          formatter.embed("text", noise, caption="Noise")
+          # Too big to be shown, compressed to be downloaded anyway.
+          formatter.embed("text", noise * 20, caption="Big noise")
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given logs are embedded
+      """
+    And a file named "check_report.py" with
+      """
+      import re
+      from pathlib import Path
+
+      report = Path("report.html").read_text(encoding="utf-8")
+      compressed = re.findall(r'<span class="to-render" compressed="true"', report)
+      plain = re.findall(r'<span mime="text">([^<]{60000})</span>', report)
+      hidden = re.findall(r'compressed="true" [^>]*show="false"', report)
+      print(f"compressed {len(compressed)}, plain {len(plain)}, hidden {len(hidden)}")
+      """
+    When I run "behave --format html-pretty -o report.html"
+    Then it should pass
+    When I run "python check_report.py"
+    Then it should pass
+    And the command output should contain
+      """
+      compressed 2, plain 1, hidden 1
+      """
+
+  Scenario: Run behave with Pretty HTML Formatter reusing encode cache
+    Given a new working directory
+    And a file named "behave.ini" with
+      """
+      [behave.formatters]
+      html-pretty = behave_html_pretty_formatter:PrettyHTMLFormatter
+      """
+    And a file named "features/steps/embed_steps.py" with
+      """
+      from behave import step
+
+      @step("logs are embedded")
+      def step_embed_logs(context):
+          formatter = context._runner.formatters[0]
+          formatter.embed("text", "some log", caption="Log", compress=True)
+          formatter.embed("text", "other log", caption="Other", compress=True)
+      """
+    And a file named "features/embed.feature" with
+      """
+      Feature: Embed
+        Scenario: One
+          Given logs are embedded
+      """
+    And a file named "cache/ddeb4d81bfa510405f8e.b64" with
+      """
+      Y2FjaGVk
+      """
+    When I run "behave --format html-pretty -D behave.formatter.html-pretty.encode_cache_dir=cache"
+    Then it should pass
+    And the command output should contain
+      """
+      <span class="to-render" compressed="true" data="Y2FjaGVk" mime="text" show="true">
+      """
+    And a file named "cache/1d2414107b6a97d9dfc7.b64" should exist
@@ -0,0 +1,395 @@
+"""
+Benchmark of PrettyHTMLFormatter on a synthetic test suite.
+
+The formatter callbacks (feature, scenario, match, embed, result, close) are
+called directly, the same way behave calls them, without behave's runner.
+Wall time, peak of memory traced by tracemalloc and size of the output
+written to the stream are recorded for every callback (phase), the result
+is written as JSON, so that it can be compared with the result of another
+version of the formatter:
+
+    python tests/benchmark/benchmark.py --features 20 -o new.json
+    python tests/benchmark/benchmark.py --features 20 --compare old.json
+
+Tracing memory slows the formatter down, use --no-tracemalloc for timing.
+"""
+
+import argparse
+import base64
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+from behave.configuration import Configuration
+from behave.formatter.base import StreamOpener
+from behave.model_core import Status
+
+from behave_html_pretty_formatter import PrettyHTMLFormatter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    from importlib import metadata
+except ImportError:
+    metadata = None
+
+PHASES = ["feature", "scenario", "match", "embed", "result", "close"]
+EMBED_MIME_TYPES = [
+    "text",
+    "text/html",
+    "text/markdown",
+    "image/png",
+    "video/webm",
+    "link",
+]
+
+
+class CountingStream:
+    """
+    Output stream of the formatter, counts written bytes.
+    Output is discarded, unless another stream is given.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text.encode("utf-8"))
+        if self.stream is not None:
+            self.stream.write(text)
+
+    def flush(self):
+        if self.stream is not None:
+            self.stream.flush()
+
+
+class PhaseRecorder:
+    """
+    Accumulates wall time, calls, peak traced memory and output size of phases.
+    """
+
+    def __init__(self, stream, trace_memory):
+        self.stream = stream
+        self.trace_memory = trace_memory
+        self.phases = {
+            phase: {"calls": 0, "time": 0.0, "peak_memory": 0, "output_size": 0}
+            for phase in PHASES
+        }
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        Measure single call of the formatter callback.
+        """
+        result = self.phases[phase]
+        output_size = self.stream.size
+        if self.trace_memory and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        result["time"] += time.perf_counter() - start
+        result["calls"] += 1
+        result["output_size"] += self.stream.size - output_size
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            result["peak_memory"] = max(result["peak_memory"], peak)
+
+
+def embed_data(mime_type, size, index):
+    """
+    Generate embed data of given MIME type, approximately size bytes long.
+    """
+    if mime_type == "link":
+        return [[f"https://example.com/{index}/{n}", f"Link {n}"] for n in range(3)]
+    line = f'Line {index} of the log, <tag> & "quotes".\n'
+    if mime_type == "text/html":
+        line = f"<p>Paragraph {index} of <b>HTML</b> embed.</p>\n"
+    if mime_type == "text/markdown":
+        line = f"* Item {index} of *markdown* embed\n"
+    if mime_type in ["image/png", "video/webm"]:
+        raw = bytes((index + n) % 256 for n in range(size * 3 // 4))
+        return base64.b64encode(raw).decode("ascii")
+    if size < len(line):
+        return line[:size]
+    # Not cut to the exact size, copy of big embed would double peak RSS.
+    return line * (size // len(line))
+
+
+def synthetic_step(args, index):
+    """
+    Generate behave step, with text and table if requested.
+    """
+    table = None
+    if args.table_rows:
+        table = SimpleNamespace(
+            headings=[f"Column {n}" for n in range(args.table_columns)],
+            rows=[
+                [f"cell {row}:{n}" for n in range(args.table_columns)]
+                for row in range(args.table_rows)
+            ],
+        )
+    return SimpleNamespace(
+        keyword="Given",
+        name=f'step "{index}" is executed',
+        text="\n".join(f"text line {n}" for n in range(args.text_lines)) or None,
+        table=table,
+        status=Status.passed,
+        duration=0.01,
+        error_message=None,
+        exception=None,
+        exc_traceback=None,
+    )
+
+
+def synthetic_scenario(args, index):
+    """
+    Generate behave scenario with steps, every fail_every-th scenario fails.
+    """
+    steps = [synthetic_step(args, step) for step in range(args.steps)]
+    status = Status.passed
+    if args.fail_every and (index + 1) % args.fail_every == 0 and steps:
+        status = Status.failed
+        steps[-1].status = Status.failed
+        steps[-1].error_message = "Assertion Failed: synthetic failure"
+    return SimpleNamespace(
+        name=f"Scenario {index}",
+        description=[],
+        location=f"synthetic.feature:{index}",
+        tags=[f"scenario_{index}"],
+        status=status,
+        steps=steps,
+        duration=0.01 * len(steps),
+        error_message=None,
+        exception=None,
+        exc_traceback=None,
+    )
+
+
+def run_suite(formatter, recorder, args):
+    """
+    Call the formatter callbacks for the whole synthetic suite.
+    """
+    embed_number = 0
+    for feature_index in range(args.features):
+        behave_feature = SimpleNamespace(
+            name=f"Feature {feature_index}",
+            description=["Synthetic feature."],
+            location=f"synthetic_{feature_index}.feature:1",
+            tags=["synthetic"],
+        )
+        with recorder.measure("feature"):
+            formatter.feature(behave_feature)
+
+        for scenario_index in range(args.scenarios):
+            behave_scenario = synthetic_scenario(args, scenario_index)
+            with recorder.measure("scenario"):
+                formatter.scenario(behave_scenario)
+
+            for step_index, behave_step in enumerate(behave_scenario.steps):
+                match = SimpleNamespace(
+                    location=SimpleNamespace(filename="steps.py", line=step_index),
+                )
+                with recorder.measure("match"):
+                    formatter.match(match)
+
+                for _ in range(args.embeds):
+                    mime_type = args.embed_mime[embed_number % len(args.embed_mime)]
+                    data = embed_data(mime_type, args.embed_size, embed_number)
+                    embed_number += 1
+                    with recorder.measure("embed"):
+                        formatter.embed(mime_type, data, caption="Embed")
+
+                with recorder.measure("result"):
+                    formatter.result(behave_step)
+
+    with recorder.measure("close"):
+        formatter.close()
+
+
+def max_rss():
+    """
+    Peak resident set size of the process in kB, None if not available.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kB elsewhere.
+    if sys.platform == "darwin":
+        usage //= 1024
+    return usage
+
+
+def formatter_version():
+    """
+    Installed version of the formatter, if any.
+    """
+    if metadata is None:
+        return None
+    try:
+        return metadata.version("behave-html-pretty-formatter")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def run_benchmark(args, output=None):
+    """
+    Run the benchmark, return the result.
+
+    :param output: Stream for the generated page, discarded if None.
+    """
+    command_args = []
+    for define in args.define:
+        command_args.extend(["-D", define])
+    config = Configuration(command_args=command_args, load_config=False)
+
+    stream = CountingStream(output)
+    recorder = PhaseRecorder(stream, args.trace_memory)
+
+    peak_memory = None
+    if args.trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    formatter = PrettyHTMLFormatter(StreamOpener(stream=stream), config)
+    run_suite(formatter, recorder, args)
+    total_time = time.perf_counter() - start
+    if args.trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "version": formatter_version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "parameters": {
+            "features": args.features,
+            "scenarios": args.scenarios,
+            "steps": args.steps,
+            "text_lines": args.text_lines,
+            "table_rows": args.table_rows,
+            "table_columns": args.table_columns,
+            "embeds": args.embeds,
+            "embed_size": args.embed_size,
+            "embed_mime": args.embed_mime,
+            "fail_every": args.fail_every,
+            "define": args.define,
+        },
+        "total": {
+            "time": total_time,
+            "peak_memory": peak_memory,
+            "max_rss": max_rss(),
+            "output_size": stream.size,
+        },
+        "phases": recorder.phases,
+    }
+
+
+def compare(result, baseline):
+    """
+    Print relative change of the result against the baseline.
+    """
+
+    def change(new, old):
+        if not new or not old:
+            return "-"
+        return f"{(new - old) / old:+.1%}"
+
+    print(f"{'phase':<10} {'time':>10} {'change':>8} {'memory':>8} {'output':>8}")
+    rows = [
+        (phase, result["phases"][phase], baseline["phases"][phase]) for phase in PHASES
+    ]
+    rows.append(("total", result["total"], baseline["total"]))
+    for phase, new, old in rows:
+        print(
+            f"{phase:<10} {new['time']:>9.3f}s {change(new['time'], old['time']):>8} "
+            f"{change(new['peak_memory'], old['peak_memory']):>8} "
+            f"{change(new['output_size'], old['output_size']):>8}",
+        )
+    new_rss = result["total"]["max_rss"]
+    old_rss = baseline["total"]["max_rss"]
+    if new_rss and old_rss:
+        print(f"{'max RSS':<10} {new_rss / 1024:>9.1f}M {change(new_rss, old_rss):>8}")
+
+
+def mime_types(value):
+    """
+    Parse comma separated list of embed MIME types.
+    """
+    values = [mime_type.strip() for mime_type in value.split(",")]
+    for mime_type in values:
+        if mime_type not in EMBED_MIME_TYPES:
+            msg = f"invalid MIME type '{mime_type}', choose from {EMBED_MIME_TYPES}"
+            raise argparse.ArgumentTypeError(msg)
+    return values
+
+
+def main(argv=None):
+    """
+    Entry point of the benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--scenarios", type=int, default=20, help="Per feature.")
+    parser.add_argument("--steps", type=int, default=5, help="Per scenario.")
+    parser.add_argument("--text-lines", type=int, default=0, help="Per step.")
+    parser.add_argument("--table-rows", type=int, default=0, help="Per step.")
+    parser.add_argument("--table-columns", type=int, default=3)
+    parser.add_argument("--embeds", type=int, default=1, help="Per step.")
+    parser.add_argument("--embed-size", type=int, default=1024, help="In bytes.")
+    parser.add_argument(
+        "--embed-mime",
+        type=mime_types,
+        default=["text"],
+        help="Comma separated MIME types of embeds, used in turns.",
+    )
+    parser.add_argument(
+        "--fail-every",
+        type=int,
+        default=0,
+        help="Every N-th scenario fails, 0 for none.",
+    )
+    parser.add_argument(
+        "-D",
+        "--define",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="Formatter option, same as behave -D.",
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        dest="trace_memory",
+        action="store_false",
+        help="Do not trace memory, it slows the formatter down.",
+    )
+    parser.add_argument("--html", help="Write the generated page to the file.")
+    parser.add_argument("-o", "--outfile", help="Write the result as JSON.")
+    parser.add_argument("--compare", help="Compare with result of previous run.")
+    args = parser.parse_args(argv)
+
+    if args.html:
+        with Path(args.html).open("w", encoding="utf-8") as output:
+            result = run_benchmark(args, output)
+    else:
+        result = run_benchmark(args)
+    if args.outfile:
+        with Path(args.outfile).open("w", encoding="utf-8") as outfile:
+            json.dump(result, outfile, indent=2)
+    if args.compare:
+        with Path(args.compare).open(encoding="utf-8") as baseline:
+            compare(result, json.load(baseline))
+    elif not args.outfile:
+        json.dump(result, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())